@@ -5,13 +5,16 @@ and receive AI-powered coaching suggestions.
 """
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import os
+import re
+import threading
+import time
+from io import StringIO
 from pathlib import Path
 from dotenv import load_dotenv
-from anthropic import Anthropic
+
+# Plotly and anthropic are imported inside the functions that use them, so pages
+# without charts or AI calls don't pay their import cost on cold start
 
 # Load environment variables
 load_dotenv()
@@ -24,13 +27,15 @@ from utils.data_loader import (
     load_colleagues, load_monthly_metrics, load_targets,
     load_objectives, load_industry_benchmarks, get_all_data,
     get_colleague_with_metrics, get_colleague_objectives,
-    load_learning_library, load_external_resources, get_recommended_learning
+    load_learning_library, load_external_resources, get_recommended_learning,
+    get_data_version, read_cached_frames, write_cached_frames
 )
 from utils.calculations import (
-    calculate_performance_score, get_performance_status, get_status_color,
+    calculate_performance_score, calculate_performance_columns, get_performance_status,
+    get_status_color, STATUS_COLORS,
     calculate_trend, get_trend_icon, calculate_metric_rag, get_rag_color,
-    identify_coaching_priority, calculate_risk_flag, calculate_goal_summary,
-    compare_to_benchmark
+    identify_coaching_priority, identify_coaching_priorities, calculate_risk_masks, decode_risk_flags,
+    calculate_target_statuses, calculate_goal_summary, compare_to_benchmark, downsample_trend
 )
 from utils.ai_prompts import (
     SYSTEM_PROMPT, get_colleague_summary_prompt, get_struggling_analysis_prompt,
@@ -45,6 +50,26 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Display orders for the low-cardinality status and tenure columns
+STATUS_ORDER = ['Role Model', 'Strong', 'On Track', 'Focus', 'Below']
+TENURE_ORDER = ['Attaining Foundation', 'Attaining Competence', 'Maintaining Competence', 'Maintaining Excellence']
+# Statuses counted as needing support
+SUPPORT_STATUSES = ['Focus', 'Below']
+
+# Maximum points drawn per trend line before LTTB downsampling kicks in
+TREND_MAX_POINTS = 500
+
+# Claude request settings shared by blocking and streaming calls
+CLAUDE_MODEL = "claude-opus-4-5-20251101"
+CLAUDE_MAX_TOKENS = 1024
+CLAUDE_TEMPERATURE = 0.3  # Lower temperature for consistent, data-driven recommendations
+# Batch calls: requests in flight at once, and SDK retries (with backoff) on 429/5xx
+CLAUDE_BATCH_CONCURRENCY = 8
+CLAUDE_BATCH_MAX_RETRIES = 3
+
+# How long an AI Coach answer is reused for an identical question against unchanged data
+CHAT_ANSWER_TTL_SECONDS = 600
+
 # Metric Tooltips - explanations for all key metrics
 METRIC_TOOLTIPS = {
     "Quality": "Overall quality score from QA evaluations. Measures compliance, accuracy, and customer service standards on calls.",
@@ -97,56 +122,125 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# Initialize Anthropic client
+# Initialize Anthropic client - one per API key, shared by every session so
+# its connection pool is reused across calls
 @st.cache_resource
+def create_anthropic_client(api_key):
+    from anthropic import Anthropic
+
+    return Anthropic(api_key=api_key)
+
+
 def get_anthropic_client():
+    # Read the key on each call rather than caching None, so a key added later is picked up
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if api_key:
-        return Anthropic(api_key=api_key)
+        return create_anthropic_client(api_key)
     return None
 
 
-# Load data
-@st.cache_data
-def load_all_data():
-    colleagues = load_colleagues()
-    metrics = load_monthly_metrics()
-    targets = load_targets()
-    objectives = load_objectives()
-    benchmarks = load_industry_benchmarks()
+# Frames returned by load_all_data, in order, and persisted to the on-disk cache
+CACHED_FRAMES = ['colleagues', 'metrics', 'targets', 'objectives', 'benchmarks', 'combined', 'latest_metrics']
 
-    # Calculate performance scores for latest month
-    latest_month = metrics['Month'].max()
-    latest_metrics = metrics[metrics['Month'] == latest_month].copy()
 
-    scores = []
-    statuses = []
-    priorities = []
-    risks = []
+def build_colleague_lookups(colleagues, metrics, objectives):
+    """Split metrics and objectives into per-colleague frames so pages look them up by ID instead of filtering."""
+    metrics_by_id = {cid: group.sort_values('Month').reset_index(drop=True)
+                     for cid, group in metrics.groupby('Colleague_ID', sort=False)}
 
-    for _, row in latest_metrics.iterrows():
-        colleague = colleagues[colleagues['Colleague_ID'] == row['Colleague_ID']].iloc[0]
-        target_row = targets[targets['Tenure_Band'] == colleague['Tenure_Band']].iloc[0]
+    # Every colleague gets an entry, even with no objectives set
+    objective_groups = dict(tuple(objectives.groupby('Colleague_ID', sort=False)))
+    no_objectives = objectives.iloc[:0]
+    objectives_by_id = {cid: objective_groups.get(cid, no_objectives).reset_index(drop=True)
+                        for cid in colleagues['Colleague_ID']}
 
-        score = calculate_performance_score(row, target_row)
-        status = get_performance_status(score)
-        priority = identify_coaching_priority(row, target_row)
-        risk = calculate_risk_flag(row)
+    return metrics_by_id, objectives_by_id
 
-        scores.append(score)
-        statuses.append(status)
-        priorities.append(priority)
-        risks.append(risk)
 
-    latest_metrics['Performance_Score'] = scores
-    latest_metrics['Performance_Status'] = statuses
-    latest_metrics['Coaching_Priority'] = priorities
-    latest_metrics['Risk_Flags'] = risks
+def build_summary_stats(combined, data_version):
+    """
+    Team-wide figures shown in the sidebar and the chat context, computed once per data load.
+    Also records the data version the frames were loaded from, for keying caches built from them.
+    """
+    # isin on the categorical compares its small integer codes, and the count needs no row copy
+    needs_support = combined['Performance_Status'].isin(SUPPORT_STATUSES)
+    return {
+        'data_version': data_version,
+        'avg_perf': combined['Performance_Score'].mean(),
+        'needing_support': int(needs_support.sum()),
+        'needing_support_ids': combined['Colleague_ID'][needs_support].tolist(),
+    }
 
-    # Merge with colleague data
-    combined = pd.merge(colleagues, latest_metrics, on='Colleague_ID', how='left')
 
-    return colleagues, metrics, targets, objectives, benchmarks, combined
+# Load data - keyed on the source files' version, so edited CSVs are picked up on the next
+# rerun; only the current version is kept in memory
+@st.cache_data(max_entries=1)
+def load_all_data(version):
+    # Reuse the Parquet cache from a previous process if the source CSVs are unchanged
+    cached = read_cached_frames(version, CACHED_FRAMES)
+    if cached is not None:
+        months = sorted(cached['metrics']['Month'].unique())
+        lookups = build_colleague_lookups(cached['colleagues'], cached['metrics'], cached['objectives'])
+        stats = build_summary_stats(cached['combined'], version)
+        return tuple(cached[name] for name in CACHED_FRAMES) + (months,) + lookups + (stats,)
+
+    # Index lookup tables by their keys (keeping the key columns) for O(1) .loc access
+    colleagues = load_colleagues()
+    colleagues = colleagues.set_index(colleagues['Colleague_ID'].to_numpy())
+    colleagues['Team'] = pd.Categorical(colleagues['Team'], categories=colleagues['Team'].unique().tolist())
+    colleagues['Tenure_Band'] = pd.Categorical(colleagues['Tenure_Band'], categories=TENURE_ORDER, ordered=True)
+    metrics = load_monthly_metrics()
+    targets = load_targets()
+    targets = targets.set_index(targets['Tenure_Band'].to_numpy())
+    objectives = load_objectives()
+    benchmarks = load_industry_benchmarks()
+    benchmarks = benchmarks.set_index(benchmarks['Metric'].to_numpy())
+
+    # Calculate performance scores for latest month
+    months = sorted(metrics['Month'].unique())
+    latest_metrics = metrics[metrics['Month'] == months[-1]]
+
+    # Join colleague info and tenure-band targets once, then score every colleague in one pass.
+    # Only the colleague columns the pages read are carried over - the full profile stays in colleagues
+    combined = (colleagues[['Colleague_ID', 'Name', 'Team', 'Tenure_Band', 'Tenure_Months']]
+                .merge(latest_metrics, on='Colleague_ID', how='left')
+                .merge(targets, on='Tenure_Band', how='left'))
+
+    combined = combined.join(calculate_performance_columns(combined))
+    combined['Coaching_Priority'] = identify_coaching_priorities(combined)
+    # Risk flags stay packed as a bitmask - only the few rows shown are decoded to lists
+    combined['Risk_Mask'] = calculate_risk_masks(combined)
+    # ABOVE/BELOW TARGET label per metric, read straight into the support-plan prompt
+    combined = combined.join(calculate_target_statuses(combined))
+
+    # Categorical dtypes make the repeated groupbys/filters compare int codes, not strings
+    combined['Team'] = combined['Team'].astype(colleagues['Team'].dtype)
+    combined['Tenure_Band'] = combined['Tenure_Band'].astype(colleagues['Tenure_Band'].dtype)
+    combined['Performance_Status'] = pd.Categorical(combined['Performance_Status'], categories=STATUS_ORDER)
+    combined['Coaching_Priority'] = combined['Coaching_Priority'].astype('category')
+    combined['Status_Color'] = combined['Status_Color'].astype('category')
+
+    # Keyed by Colleague_ID like colleagues, so a single colleague's row is a .loc lookup
+    combined.index = combined['Colleague_ID'].to_numpy()
+
+    frames = (colleagues, metrics, targets, objectives, benchmarks, combined, latest_metrics)
+    write_cached_frames(version, dict(zip(CACHED_FRAMES, frames)))
+
+    lookups = build_colleague_lookups(colleagues, metrics, objectives)
+    return frames + (months,) + lookups + (build_summary_stats(combined, version),)
+
+
+def build_system(system_prompt, reference_context):
+    """
+    System blocks for a request carrying large reference data that is identical across calls.
+    The reference block follows the system prompt and carries the prompt-cache breakpoint, so
+    the whole unchanging prefix is cached by Anthropic and reused on the next call; the
+    question-specific part stays in the user message after it.
+    """
+    return [
+        {"type": "text", "text": system_prompt},
+        {"type": "text", "text": reference_context, "cache_control": {"type": "ephemeral"}},
+    ]
 
 
 def call_claude(prompt, system_prompt=SYSTEM_PROMPT):
@@ -157,9 +251,9 @@ def call_claude(prompt, system_prompt=SYSTEM_PROMPT):
 
     try:
         message = client.messages.create(
-            model="claude-opus-4-5-20251101",
-            max_tokens=1024,
-            temperature=0.3,  # Lower temperature for consistent, data-driven recommendations
+            model=CLAUDE_MODEL,
+            max_tokens=CLAUDE_MAX_TOKENS,
+            temperature=CLAUDE_TEMPERATURE,
             system=system_prompt,
             messages=[{"role": "user", "content": prompt}]
         )
@@ -168,6 +262,72 @@ def call_claude(prompt, system_prompt=SYSTEM_PROMPT):
         return f"Error calling AI: {str(e)}"
 
 
+def stream_claude(prompt, system_prompt=SYSTEM_PROMPT, reference_context=None, outcome=None):
+    """
+    Stream a Claude response, yielding text chunks as they arrive (for st.write_stream).
+    reference_context, if given, is sent as a cached system block (see build_system).
+    Failures are yielded as an error message; pass an outcome dict to have
+    outcome['failed'] set too, since the message may follow partial text.
+    """
+    client = get_anthropic_client()
+    if not client:
+        if outcome is not None:
+            outcome['failed'] = True
+        yield "AI features unavailable - API key not configured."
+        return
+
+    try:
+        with client.messages.stream(
+            model=CLAUDE_MODEL,
+            max_tokens=CLAUDE_MAX_TOKENS,
+            temperature=CLAUDE_TEMPERATURE,
+            system=build_system(system_prompt, reference_context) if reference_context else system_prompt,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            yield from stream.text_stream
+    except Exception as e:
+        if outcome is not None:
+            outcome['failed'] = True
+        yield f"Error calling AI: {str(e)}"
+
+
+def call_claude_batch(prompts, system_prompt=SYSTEM_PROMPT):
+    """
+    Call Claude for several prompts concurrently, returning the responses in prompt order.
+    Total wait is roughly the slowest single request rather than the sum of all of them;
+    at most CLAUDE_BATCH_CONCURRENCY requests are in flight to stay under rate limits.
+    """
+    import asyncio
+    from anthropic import AsyncAnthropic
+
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        return ["AI features unavailable - API key not configured."] * len(prompts)
+
+    async def run_all():
+        limit = asyncio.Semaphore(CLAUDE_BATCH_CONCURRENCY)
+
+        # A fresh async client per batch - its connection pool is tied to this event loop
+        async with AsyncAnthropic(api_key=api_key, max_retries=CLAUDE_BATCH_MAX_RETRIES) as client:
+            async def create(prompt):
+                async with limit:
+                    return await client.messages.create(
+                        model=CLAUDE_MODEL,
+                        max_tokens=CLAUDE_MAX_TOKENS,
+                        temperature=CLAUDE_TEMPERATURE,
+                        system=system_prompt,
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+
+            return await asyncio.gather(*[create(prompt) for prompt in prompts], return_exceptions=True)
+
+    results = asyncio.run(run_all())
+    return [
+        f"Error calling AI: {str(result)}" if isinstance(result, Exception) else result.content[0].text
+        for result in results
+    ]
+
+
 def generate_coaching_export(colleague_name, team, tenure, score, status, coaching_content):
     """Generate formatted export content for AI coaching insights."""
     from datetime import datetime
@@ -198,17 +358,108 @@ AI COACHING INSIGHTS
     return export_text
 
 
+# ============== CHART BUILDERS ==============
+# Figures are memoised on small, cheaply hashed inputs so reruns that don't change
+# the underlying data reuse the built figure instead of reconstructing it.
+
+@st.cache_data
+def build_status_bar(status_counts):
+    """Build the performance status distribution chart from (status, count) pairs."""
+    import plotly.graph_objects as go
+
+    counts = dict(status_counts)
+    shown = [s for s in STATUS_ORDER if s in counts]
+
+    fig = go.Figure(data=[go.Bar(
+        x=[counts[s] for s in shown],
+        y=shown,
+        orientation='h',
+        marker_color=[STATUS_COLORS[s] for s in shown],
+        text=[counts[s] for s in shown],
+        textposition='auto'
+    )])
+    # Role Model at the top, Below at the bottom
+    fig.update_layout(height=300, margin=dict(t=20, b=20, l=20, r=20), yaxis=dict(autorange='reversed'))
+    return fig
+
+
+@st.cache_data
+def build_benchmark_bars(team_avg, industry_avg):
+    """Build the grouped team vs industry benchmark bar chart."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name='Our Team', x=list(team_avg.keys()), y=list(team_avg.values()), marker_color='#3B82F6'))
+    fig.add_trace(go.Bar(name='Industry Average', x=list(industry_avg.keys()), y=list(industry_avg.values()), marker_color='#9CA3AF'))
+    fig.update_layout(barmode='group', height=300, margin=dict(t=20, b=20, l=20, r=20))
+    return fig
+
+
+@st.cache_data
+def build_tenure_bar(tenure_scores):
+    """Build the average performance score by tenure band chart from (band, score) pairs."""
+    import plotly.express as px
+
+    tenure_performance = pd.DataFrame(tenure_scores, columns=['Tenure_Band', 'Performance_Score'])
+    fig = px.bar(tenure_performance, x='Tenure_Band', y='Performance_Score',
+                 color='Performance_Score', color_continuous_scale='Blues',
+                 labels={'Performance_Score': 'Avg Score', 'Tenure_Band': 'Tenure Band'})
+    fig.update_layout(height=300, showlegend=False)
+    return fig
+
+
+@st.cache_data(max_entries=64)
+def build_trend_subplots(colleague_id, data_version, _colleague_metrics, _target_row):
+    """
+    Build the 2x2 individual trend chart.
+    Cached on colleague and data version only - the underscore-prefixed frames are not hashed.
+    """
+    import plotly.express as px
+
+    # metric column -> (facet title, target column, colour)
+    trend_charts = {
+        'Quality_Pct': ('Quality Score', 'Quality_Target', '#3B82F6'),
+        'FCR_Pct': ('FCR', 'FCR_Target', '#10B981'),
+        'CSAT_Pct': ('CSAT', 'CSAT_Target', '#8B5CF6'),
+        'AHT_Min': ('AHT', 'AHT_Target', '#F59E0B'),
+    }
+    titles = {col: spec[0] for col, spec in trend_charts.items()}
+
+    # Long form lets a single faceted px.line replace four add_trace calls
+    long = (_colleague_metrics
+            .melt(id_vars='Month', value_vars=list(trend_charts), var_name='Metric', value_name='Value')
+            .assign(Metric=lambda d: d['Metric'].map(titles)))
+    long = downsample_trend(long, 'Month', 'Value', TREND_MAX_POINTS, group_column='Metric')
+
+    fig = px.line(long, x='Month', y='Value', color='Metric', facet_col='Metric', facet_col_wrap=2,
+                  category_orders={'Metric': list(titles.values())},
+                  color_discrete_map={title: color for title, _, color in trend_charts.values()},
+                  markers=True, render_mode='webgl')
+    fig.for_each_annotation(lambda a: a.update(text=a.text.split('=')[-1]))
+    fig.update_yaxes(matches=None, showticklabels=True, title_text='')
+    fig.update_xaxes(title_text='')
+
+    # Target lines as one batch of shapes, placed on whichever facet axes hold each metric
+    targets_by_title = {title: _target_row[target_col] for title, target_col, _ in trend_charts.values()}
+    fig.update_layout(shapes=[
+        dict(type='line', xref=f'{trace.xaxis} domain', yref=trace.yaxis, x0=0, x1=1,
+             y0=targets_by_title[trace.name], y1=targets_by_title[trace.name],
+             line=dict(color='gray', dash='dash'))
+        for trace in fig.data
+    ])
+
+    fig.update_layout(height=500, showlegend=False)
+    return fig
+
+
 # ============== PAGE: OVERVIEW DASHBOARD ==============
-def show_overview_dashboard(colleagues, metrics, targets, benchmarks, combined):
+def show_overview_dashboard(colleagues, latest_metrics, targets, benchmarks, combined):
     st.title("📊 Performance Overview Dashboard")
     st.markdown("---")
 
     # Top-level metrics
     col1, col2, col3, col4, col5 = st.columns(5)
 
-    latest_month = metrics['Month'].max()
-    latest_metrics = metrics[metrics['Month'] == latest_month]
-
     with col1:
         avg_quality = latest_metrics['Quality_Pct'].mean()
         st.metric("Avg Quality", f"{avg_quality:.1f}%",
@@ -240,16 +491,9 @@ def show_overview_dashboard(colleagues, metrics, targets, benchmarks, combined):
         st.subheader("Performance Status Distribution")
 
         status_counts = combined['Performance_Status'].value_counts()
-        status_order = ['Role Model', 'Strong', 'On Track', 'Focus', 'Below']
-        status_colors = ['#10B981', '#3B82F6', '#6366F1', '#F59E0B', '#EF4444']
-
-        fig = go.Figure(data=[go.Pie(
-            labels=[s for s in status_order if s in status_counts.index],
-            values=[status_counts.get(s, 0) for s in status_order if s in status_counts.index],
-            marker_colors=[status_colors[status_order.index(s)] for s in status_order if s in status_counts.index],
-            hole=0.4
-        )])
-        fig.update_layout(height=300, margin=dict(t=20, b=20, l=20, r=20))
+        status_counts = status_counts[status_counts > 0]
+
+        fig = build_status_bar(tuple(status_counts.items()))
         st.plotly_chart(fig, use_container_width=True)
 
     with col2:
@@ -264,22 +508,13 @@ def show_overview_dashboard(colleagues, metrics, targets, benchmarks, combined):
         }
 
         industry_avg = {
-            'FCR': benchmarks[benchmarks['Metric'] == 'FCR_Pct']['Industry_Average'].values[0],
-            'Quality': benchmarks[benchmarks['Metric'] == 'Quality_Pct']['Industry_Average'].values[0],
-            'CSAT': benchmarks[benchmarks['Metric'] == 'CSAT_Pct']['Industry_Average'].values[0],
-            'NPS': benchmarks[benchmarks['Metric'] == 'NPS']['Industry_Average'].values[0]
+            'FCR': benchmarks.at['FCR_Pct', 'Industry_Average'],
+            'Quality': benchmarks.at['Quality_Pct', 'Industry_Average'],
+            'CSAT': benchmarks.at['CSAT_Pct', 'Industry_Average'],
+            'NPS': benchmarks.at['NPS', 'Industry_Average']
         }
 
-        comparison_df = pd.DataFrame({
-            'Metric': list(team_avg.keys()),
-            'Our Team': list(team_avg.values()),
-            'Industry Average': list(industry_avg.values())
-        })
-
-        fig = go.Figure()
-        fig.add_trace(go.Bar(name='Our Team', x=comparison_df['Metric'], y=comparison_df['Our Team'], marker_color='#3B82F6'))
-        fig.add_trace(go.Bar(name='Industry Average', x=comparison_df['Metric'], y=comparison_df['Industry Average'], marker_color='#9CA3AF'))
-        fig.update_layout(barmode='group', height=300, margin=dict(t=20, b=20, l=20, r=20))
+        fig = build_benchmark_bars(team_avg, industry_avg)
         st.plotly_chart(fig, use_container_width=True)
 
     st.markdown("---")
@@ -287,16 +522,16 @@ def show_overview_dashboard(colleagues, metrics, targets, benchmarks, combined):
     # Risk Alerts
     st.subheader("⚠️ Risk Alerts - Colleagues Needing Attention")
 
-    risk_colleagues = combined[combined['Risk_Flags'].notna()].copy()
+    risk_colleagues = combined[combined['Risk_Mask'] > 0]
     if len(risk_colleagues) > 0:
-        for _, row in risk_colleagues.head(5).iterrows():
-            risks = row['Risk_Flags']
+        for row in risk_colleagues.head(5).itertuples(index=False):
+            risks = decode_risk_flags(row.Risk_Mask)
             if risks:
-                with st.expander(f"🚨 {row['Name']} ({row['Team']}) - {row['Performance_Status']}"):
-                    st.write(f"**Tenure:** {row['Tenure_Band']} ({row['Tenure_Months']} months)")
+                with st.expander(f"🚨 {row.Name} ({row.Team}) - {row.Performance_Status}"):
+                    st.write(f"**Tenure:** {row.Tenure_Band} ({row.Tenure_Months} months)")
                     st.write(f"**Risk Flags:** {', '.join(risks)}")
-                    st.write(f"**Coaching Priority:** {row['Coaching_Priority']}")
-                    st.write(f"**Performance Score:** {row['Performance_Score']:.1f}/100")
+                    st.write(f"**Coaching Priority:** {row.Coaching_Priority}")
+                    st.write(f"**Performance Score:** {row.Performance_Score:.1f}/100")
     else:
         st.success("No colleagues with risk flags this month!")
 
@@ -304,20 +539,15 @@ def show_overview_dashboard(colleagues, metrics, targets, benchmarks, combined):
     st.markdown("---")
     st.subheader("Performance by Tenure Band")
 
-    tenure_performance = combined.groupby('Tenure_Band').agg({
+    # Tenure_Band is an ordered categorical, so groups come back in tenure order
+    tenure_performance = combined.groupby('Tenure_Band', observed=True).agg({
         'Performance_Score': 'mean',
         'Quality_Pct': 'mean',
         'FCR_Pct': 'mean',
         'CSAT_Pct': 'mean'
     }).round(1)
 
-    tenure_order = ['Attaining Foundation', 'Attaining Competence', 'Maintaining Competence', 'Maintaining Excellence']
-    tenure_performance = tenure_performance.reindex([t for t in tenure_order if t in tenure_performance.index])
-
-    fig = px.bar(tenure_performance, x=tenure_performance.index, y='Performance_Score',
-                 color='Performance_Score', color_continuous_scale='Blues',
-                 labels={'Performance_Score': 'Avg Score', 'index': 'Tenure Band'})
-    fig.update_layout(height=300, showlegend=False)
+    fig = build_tenure_bar(tuple(tenure_performance['Performance_Score'].items()))
     st.plotly_chart(fig, use_container_width=True)
 
 
@@ -336,13 +566,14 @@ def show_colleague_explorer(colleagues, metrics, combined):
         tenure_filter = st.selectbox("Filter by Tenure Band", ["All"] + list(colleagues['Tenure_Band'].unique()))
 
     with col3:
-        status_filter = st.selectbox("Filter by Status", ["All", "Role Model", "Strong", "On Track", "Focus", "Below"])
+        status_filter = st.selectbox("Filter by Status", ["All"] + STATUS_ORDER)
 
     with col4:
         sort_by = st.selectbox("Sort by", ["Performance Score", "Name", "Tenure"])
 
     # Apply filters
-    filtered = combined.copy()
+    # Filters and sorts below each return a new frame, so combined itself is never modified
+    filtered = combined
 
     if team_filter != "All":
         filtered = filtered[filtered['Team'] == team_filter]
@@ -364,52 +595,68 @@ def show_colleague_explorer(colleagues, metrics, combined):
     st.markdown(f"**Showing {len(filtered)} colleagues**")
     st.markdown("---")
 
-    # Display colleagues as cards
+    # Display colleagues as cards - one HTML grid per row of three, with the
+    # (stateful) View Details buttons in matching columns underneath
     for i in range(0, len(filtered), 3):
-        cols = st.columns(3)
-        for j, col in enumerate(cols):
-            if i + j < len(filtered):
-                row = filtered.iloc[i + j]
-                with col:
-                    status_color = get_status_color(row['Performance_Status'])
-
-                    st.markdown(f"""
-                    <div style="background-color: #f8f9fa; border-radius: 10px; padding: 15px; margin-bottom: 10px; border-left: 4px solid {status_color};">
-                        <h4 style="margin: 0 0 10px 0;">{row['Name']}</h4>
-                        <p style="margin: 5px 0; color: #666;"><strong>Team:</strong> {row['Team']}</p>
-                        <p style="margin: 5px 0; color: #666;"><strong>Tenure:</strong> {row['Tenure_Band']} ({row['Tenure_Months']}mo)</p>
-                        <p style="margin: 5px 0;"><strong>Score:</strong> {row['Performance_Score']:.1f}/100</p>
-                        <span style="background-color: {status_color}; color: white; padding: 3px 10px; border-radius: 10px; font-size: 12px;">{row['Performance_Status']}</span>
-                    </div>
-                    """, unsafe_allow_html=True)
+        row_colleagues = filtered.iloc[i:i + 3]
+
+        cards_html = []
+        for row in row_colleagues.itertuples(index=False):
+            status_color = row.Status_Color
+            cards_html.append(f"""
+            <div style="background-color: #f8f9fa; border-radius: 10px; padding: 15px; margin-bottom: 10px; border-left: 4px solid {status_color};">
+                <h4 style="margin: 0 0 10px 0;">{row.Name}</h4>
+                <p style="margin: 5px 0; color: #666;"><strong>Team:</strong> {row.Team}</p>
+                <p style="margin: 5px 0; color: #666;"><strong>Tenure:</strong> {row.Tenure_Band} ({row.Tenure_Months}mo)</p>
+                <p style="margin: 5px 0;"><strong>Score:</strong> {row.Performance_Score:.1f}/100</p>
+                <span style="background-color: {status_color}; color: white; padding: 3px 10px; border-radius: 10px; font-size: 12px;">{row.Performance_Status}</span>
+            </div>""")
+
+        st.markdown(f"""
+        <div style="display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem;">{''.join(cards_html)}
+        </div>
+        """, unsafe_allow_html=True)
 
-                    if st.button(f"View Details", key=f"view_{row['Colleague_ID']}"):
-                        st.session_state['selected_colleague'] = row['Colleague_ID']
-                        st.session_state['page'] = 'Individual View'
-                        st.rerun()
+        cols = st.columns(3)
+        for col, row in zip(cols, row_colleagues.itertuples(index=False)):
+            with col:
+                if st.button(f"View Details", key=f"view_{row.Colleague_ID}"):
+                    st.session_state['selected_colleague'] = row.Colleague_ID
+                    st.session_state['page'] = 'Individual View'
+                    st.rerun()
 
 
 # ============== PAGE: INDIVIDUAL COLLEAGUE VIEW ==============
-def show_individual_view(colleagues, metrics, targets, objectives, combined):
+def show_individual_view(colleagues, metrics_by_id, targets, objectives_by_id, combined, data_version):
     st.title("👤 Individual Colleague View")
 
     # Colleague selector
-    colleague_options = {f"{row['Name']} ({row['Team']})": row['Colleague_ID']
-                        for _, row in colleagues.iterrows()}
+    colleague_options = {f"{row.Name} ({row.Team})": row.Colleague_ID
+                        for row in colleagues.itertuples(index=False)}
 
     selected_name = st.selectbox("Select Colleague", list(colleague_options.keys()))
     selected_id = colleague_options[selected_name]
 
-    colleague = colleagues[colleagues['Colleague_ID'] == selected_id].iloc[0]
-    colleague_metrics = metrics[metrics['Colleague_ID'] == selected_id].sort_values('Month')
-    colleague_objectives = objectives[objectives['Colleague_ID'] == selected_id]
-    target_row = targets[targets['Tenure_Band'] == colleague['Tenure_Band']].iloc[0]
+    colleague = colleagues.loc[selected_id]
+    colleague_metrics = metrics_by_id[selected_id]
+    colleague_objectives = objectives_by_id[selected_id]
+    target_row = targets.loc[colleague['Tenure_Band']]
     latest = colleague_metrics.iloc[-1]
 
-    # Calculate score and status
-    score = calculate_performance_score(latest, target_row)
-    status = get_performance_status(score)
-    status_color = get_status_color(status)
+    # Score, status, colour and priority are precomputed in combined for the team-wide latest month;
+    # only a colleague with no row for that month is scored from their own latest month
+    colleague_current = combined.loc[selected_id]
+    has_current = pd.notna(colleague_current['Month'])
+    if has_current:
+        score = colleague_current['Performance_Score']
+        status = colleague_current['Performance_Status']
+        status_color = colleague_current['Status_Color']
+        priority = colleague_current['Coaching_Priority']
+    else:
+        score = calculate_performance_score(latest, target_row)
+        status = get_performance_status(score)
+        status_color = get_status_color(status)
+        priority = identify_coaching_priority(latest, target_row)
 
     st.markdown("---")
 
@@ -432,7 +679,6 @@ def show_individual_view(colleagues, metrics, targets, objectives, combined):
         """, unsafe_allow_html=True)
 
     with col4:
-        priority = identify_coaching_priority(latest, target_row)
         st.metric("Focus Area", priority)
 
     st.markdown("---")
@@ -459,44 +705,30 @@ def show_individual_view(colleagues, metrics, targets, objectives, combined):
             ("NPS", latest['NPS'], target_row['NPS_Target'], "", True, "NPS"),
         ]
 
-        cols = st.columns(4)
-        for i, (name, actual, target, unit, higher_better, tooltip_key) in enumerate(metrics_data):
+        # Build the whole scorecard as a single 4-column grid
+        cards_html = []
+        for name, actual, target, unit, higher_better, tooltip_key in metrics_data:
             rag = calculate_metric_rag(actual, target, higher_better)
             rag_color = get_rag_color(rag)
             tooltip = METRIC_TOOLTIPS.get(tooltip_key, "")
 
-            with cols[i % 4]:
-                st.markdown(f"""
-                <div style="background-color: #f8f9fa; border-radius: 8px; padding: 15px; margin: 5px 0; border-left: 4px solid {rag_color};" title="{tooltip}">
-                    <p style="margin: 0; color: #666; font-size: 12px;">{name} <span style="cursor: help; color: #999;" title="{tooltip}">ⓘ</span></p>
-                    <p style="margin: 5px 0; font-size: 20px; font-weight: bold;">{actual}{unit}</p>
-                    <p style="margin: 0; color: #999; font-size: 11px;" title="Target adjusted for {colleague['Tenure_Band']}">🎯 Target: {target}{unit}</p>
-                </div>
-                """, unsafe_allow_html=True)
+            cards_html.append(f"""
+            <div style="background-color: #f8f9fa; border-radius: 8px; padding: 15px; margin: 5px 0; border-left: 4px solid {rag_color};" title="{tooltip}">
+                <p style="margin: 0; color: #666; font-size: 12px;">{name} <span style="cursor: help; color: #999;" title="{tooltip}">ⓘ</span></p>
+                <p style="margin: 5px 0; font-size: 20px; font-weight: bold;">{actual}{unit}</p>
+                <p style="margin: 0; color: #999; font-size: 11px;" title="Target adjusted for {colleague['Tenure_Band']}">🎯 Target: {target}{unit}</p>
+            </div>""")
+
+        st.markdown(f"""
+        <div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 1rem;">{''.join(cards_html)}
+        </div>
+        """, unsafe_allow_html=True)
 
     with tab2:
         st.subheader("3-Month Performance Trends")
 
         # Create trend charts
-        fig = make_subplots(rows=2, cols=2, subplot_titles=('Quality Score', 'FCR', 'CSAT', 'AHT'))
-
-        fig.add_trace(go.Scatter(x=colleague_metrics['Month'], y=colleague_metrics['Quality_Pct'],
-                                mode='lines+markers', name='Quality', line=dict(color='#3B82F6')), row=1, col=1)
-        fig.add_hline(y=target_row['Quality_Target'], line_dash="dash", line_color="gray", row=1, col=1)
-
-        fig.add_trace(go.Scatter(x=colleague_metrics['Month'], y=colleague_metrics['FCR_Pct'],
-                                mode='lines+markers', name='FCR', line=dict(color='#10B981')), row=1, col=2)
-        fig.add_hline(y=target_row['FCR_Target'], line_dash="dash", line_color="gray", row=1, col=2)
-
-        fig.add_trace(go.Scatter(x=colleague_metrics['Month'], y=colleague_metrics['CSAT_Pct'],
-                                mode='lines+markers', name='CSAT', line=dict(color='#8B5CF6')), row=2, col=1)
-        fig.add_hline(y=target_row['CSAT_Target'], line_dash="dash", line_color="gray", row=2, col=1)
-
-        fig.add_trace(go.Scatter(x=colleague_metrics['Month'], y=colleague_metrics['AHT_Min'],
-                                mode='lines+markers', name='AHT', line=dict(color='#F59E0B')), row=2, col=2)
-        fig.add_hline(y=target_row['AHT_Target'], line_dash="dash", line_color="gray", row=2, col=2)
-
-        fig.update_layout(height=500, showlegend=False)
+        fig = build_trend_subplots(selected_id, data_version, colleague_metrics, target_row)
         st.plotly_chart(fig, use_container_width=True)
 
         # Trend indicators
@@ -520,24 +752,27 @@ def show_individual_view(colleagues, metrics, targets, objectives, combined):
 
         st.markdown("---")
 
-        for _, obj in colleague_objectives.iterrows():
-            status_colors = {'Achieved': '#10B981', 'On Track': '#3B82F6', 'At Risk': '#F59E0B', 'Behind': '#EF4444'}
-            color = status_colors.get(obj['Status'], '#6B7280')
+        status_colors = {'Achieved': '#10B981', 'On Track': '#3B82F6', 'At Risk': '#F59E0B', 'Behind': '#EF4444'}
+        objective_cards = []
+        for obj in colleague_objectives.itertuples(index=False):
+            color = status_colors.get(obj.Status, '#6B7280')
 
-            st.markdown(f"""
+            objective_cards.append(f"""
             <div style="background-color: #f8f9fa; border-radius: 8px; padding: 15px; margin: 10px 0; border-left: 4px solid {color};">
                 <div style="display: flex; justify-content: space-between; align-items: center;">
                     <div>
-                        <p style="margin: 0; font-weight: bold;">{obj['Objective_Text']}</p>
-                        <p style="margin: 5px 0 0 0; color: #666; font-size: 12px;">{obj['Objective_Type']} - {obj['Category']}</p>
+                        <p style="margin: 0; font-weight: bold;">{obj.Objective_Text}</p>
+                        <p style="margin: 5px 0 0 0; color: #666; font-size: 12px;">{obj.Objective_Type} - {obj.Category}</p>
                     </div>
                     <div style="text-align: right;">
-                        <span style="background-color: {color}; color: white; padding: 3px 10px; border-radius: 10px; font-size: 12px;">{obj['Status']}</span>
-                        <p style="margin: 5px 0 0 0; color: #666; font-size: 12px;">{obj['Progress_Pct']}% complete</p>
+                        <span style="background-color: {color}; color: white; padding: 3px 10px; border-radius: 10px; font-size: 12px;">{obj.Status}</span>
+                        <p style="margin: 5px 0 0 0; color: #666; font-size: 12px;">{obj.Progress_Pct}% complete</p>
                     </div>
                 </div>
-            </div>
-            """, unsafe_allow_html=True)
+            </div>""")
+
+        if objective_cards:
+            st.markdown("".join(objective_cards), unsafe_allow_html=True)
 
     with tab4:
         st.subheader("AI-Powered Support Plan")
@@ -549,33 +784,36 @@ def show_individual_view(colleagues, metrics, targets, objectives, combined):
             st.session_state[coaching_key] = None
 
         if st.button("Generate AI Support Plan", type="primary"):
-            with st.spinner("Generating personalised support plan..."):
-                # Prepare objectives summary
-                obj_summary = "\n".join([f"- {row['Objective_Text']}: {row['Status']} ({row['Progress_Pct']}%)"
-                                        for _, row in colleague_objectives.iterrows()])
-
-                # Get recommended learning based on performance gaps
-                learning_recs, triggers = get_recommended_learning(
-                    latest.to_dict(),
-                    target_row.to_dict(),
-                    colleague['Tenure_Band']
-                )
+            # Prepare objectives summary
+            obj_summary = "\n".join([f"- {row.Objective_Text}: {row.Status} ({row.Progress_Pct}%)"
+                                    for row in colleague_objectives.itertuples(index=False)])
+
+            # Get recommended learning based on performance gaps
+            learning_recs, triggers = get_recommended_learning(
+                latest.to_dict(),
+                target_row.to_dict(),
+                colleague['Tenure_Band']
+            )
 
-                prompt = get_colleague_summary_prompt(
-                    colleague.to_dict(),
-                    latest.to_dict(),
-                    target_row.to_dict(),
-                    obj_summary,
-                    learning_recs
-                )
+            # The combined row carries the latest metrics plus their precomputed target statuses;
+            # a colleague with no row for the team-wide latest month is sent their own latest month
+            metrics_data = colleague_current if has_current else latest
+            prompt = get_colleague_summary_prompt(
+                colleague.to_dict(),
+                metrics_data.to_dict(),
+                target_row.to_dict(),
+                obj_summary,
+                learning_recs
+            )
 
-                response = call_claude(prompt)
-                st.session_state[coaching_key] = response
+            # Render tokens as they arrive, keeping the full text for later reruns
+            st.session_state[coaching_key] = st.write_stream(stream_claude(prompt))
 
-        # Display coaching if available
-        if st.session_state[coaching_key]:
+        # Display previously generated coaching
+        elif st.session_state[coaching_key]:
             st.markdown(st.session_state[coaching_key])
 
+        if st.session_state[coaching_key]:
             # Export button
             st.markdown("---")
             export_content = generate_coaching_export(
@@ -599,7 +837,9 @@ def show_individual_view(colleagues, metrics, targets, objectives, combined):
 
 
 # ============== PAGE: TRENDS & ANALYTICS ==============
-def show_trends(colleagues, metrics, targets, combined):
+def show_trends(colleagues, metrics, months, targets, combined):
+    import plotly.express as px
+
     st.title("📈 Trends & Analytics")
     st.markdown("---")
 
@@ -627,18 +867,21 @@ def show_trends(colleagues, metrics, targets, combined):
     # Generate trend chart
     if group_by == "Overall":
         trend_data = metrics.groupby('Month')[metric_col].mean().reset_index()
+        trend_data = downsample_trend(trend_data, 'Month', metric_col, TREND_MAX_POINTS)
         fig = px.line(trend_data, x='Month', y=metric_col, markers=True,
                      title=f"{selected_metric} Trend - Overall")
 
     elif group_by == "Team":
         merged = metrics.merge(colleagues[['Colleague_ID', 'Team']], on='Colleague_ID')
-        trend_data = merged.groupby(['Month', 'Team'])[metric_col].mean().reset_index()
+        trend_data = merged.groupby(['Month', 'Team'], observed=True)[metric_col].mean().reset_index()
+        trend_data = downsample_trend(trend_data, 'Month', metric_col, TREND_MAX_POINTS, group_column='Team')
         fig = px.line(trend_data, x='Month', y=metric_col, color='Team', markers=True,
                      title=f"{selected_metric} Trend by Team")
 
     else:
         merged = metrics.merge(colleagues[['Colleague_ID', 'Tenure_Band']], on='Colleague_ID')
-        trend_data = merged.groupby(['Month', 'Tenure_Band'])[metric_col].mean().reset_index()
+        trend_data = merged.groupby(['Month', 'Tenure_Band'], observed=True)[metric_col].mean().reset_index()
+        trend_data = downsample_trend(trend_data, 'Month', metric_col, TREND_MAX_POINTS, group_column='Tenure_Band')
         fig = px.line(trend_data, x='Month', y=metric_col, color='Tenure_Band', markers=True,
                      title=f"{selected_metric} Trend by Tenure Band")
 
@@ -650,6 +893,24 @@ def show_trends(colleagues, metrics, targets, combined):
     # Movers analysis
     st.subheader("Top Movers This Month")
 
+    # Month-over-month change for the selected metric, built once for both columns
+    top_improved = needs_support = None
+
+    if len(months) >= 2:
+        latest = metrics.loc[metrics['Month'] == months[-1], ['Colleague_ID', metric_col]]
+        previous = metrics.loc[metrics['Month'] == months[-2], ['Colleague_ID', metric_col]]
+
+        changes = (latest.merge(previous, on='Colleague_ID', suffixes=('_now', '_prev'))
+                   .assign(Change=lambda d: d[f'{metric_col}_now'] - d[f'{metric_col}_prev'])
+                   .merge(colleagues[['Colleague_ID', 'Name', 'Team', 'Tenure_Band']], on='Colleague_ID'))
+
+        top_improved = changes.nlargest(5, 'Change')
+        needs_support = changes.nsmallest(5, 'Change')
+
+        # Lower AHT is an improvement
+        if metric_col == 'AHT_Min':
+            top_improved, needs_support = needs_support, top_improved
+
     col1, col2 = st.columns(2)
 
     # Store top improved for Valued feature
@@ -657,46 +918,26 @@ def show_trends(colleagues, metrics, targets, combined):
 
     with col1:
         st.markdown("**📈 Most Improved**")
-        # Calculate month-over-month change
-        if len(metrics['Month'].unique()) >= 2:
-            months = sorted(metrics['Month'].unique())
-            latest = metrics[metrics['Month'] == months[-1]]
-            previous = metrics[metrics['Month'] == months[-2]]
-
-            merged = latest.merge(previous, on='Colleague_ID', suffixes=('_now', '_prev'))
-            merged['Change'] = merged[f'{metric_col}_now'] - merged[f'{metric_col}_prev']
-
-            if metric_col == 'AHT_Min':
-                top_improved = merged.nsmallest(5, 'Change')
-            else:
-                top_improved = merged.nlargest(5, 'Change')
-
-            for _, row in top_improved.iterrows():
-                colleague = colleagues[colleagues['Colleague_ID'] == row['Colleague_ID']].iloc[0]
-                st.write(f"**{colleague['Name']}** ({colleague['Team']}): {row['Change']:+.1f}")
+        if top_improved is not None:
+            for row in top_improved.itertuples(index=False):
+                st.write(f"**{row.Name}** ({row.Team}): {row.Change:+.1f}")
                 # Store for Valued feature
                 top_improved_data.append({
-                    'colleague_id': row['Colleague_ID'],
-                    'name': colleague['Name'],
-                    'team': colleague['Team'],
-                    'tenure_band': colleague['Tenure_Band'],
+                    'colleague_id': row.Colleague_ID,
+                    'name': row.Name,
+                    'team': row.Team,
+                    'tenure_band': row.Tenure_Band,
                     'metric_name': selected_metric,
-                    'previous_value': row[f'{metric_col}_prev'],
-                    'current_value': row[f'{metric_col}_now'],
-                    'change': row['Change']
+                    'previous_value': getattr(row, f'{metric_col}_prev'),
+                    'current_value': getattr(row, f'{metric_col}_now'),
+                    'change': row.Change
                 })
 
     with col2:
         st.markdown("**📉 Needs Support**")
-        if len(metrics['Month'].unique()) >= 2:
-            if metric_col == 'AHT_Min':
-                needs_support = merged.nlargest(5, 'Change')
-            else:
-                needs_support = merged.nsmallest(5, 'Change')
-
-            for _, row in needs_support.iterrows():
-                colleague = colleagues[colleagues['Colleague_ID'] == row['Colleague_ID']].iloc[0]
-                st.write(f"**{colleague['Name']}** ({colleague['Team']}): {row['Change']:+.1f}")
+        if needs_support is not None:
+            for row in needs_support.itertuples(index=False):
+                st.write(f"**{row.Name}** ({row.Team}): {row.Change:+.1f}")
 
     # Valued Recognition Section
     st.markdown("---")
@@ -775,12 +1016,14 @@ def show_trends(colleagues, metrics, targets, combined):
 
         # Export all cards
         st.markdown("---")
-        all_cards_text = "VALUED RECOGNITION CARDS\n" + "=" * 50 + "\n\n"
+        all_cards = StringIO()
+        all_cards.write("VALUED RECOGNITION CARDS\n" + "=" * 50 + "\n\n")
         for card in st.session_state.valued_cards:
-            all_cards_text += f"TO: {card['name']} ({card['team']})\n"
-            all_cards_text += f"ACHIEVEMENT: {card['metric']} improved by {card['change']:+.1f}\n\n"
-            all_cards_text += f"{card['message']}\n"
-            all_cards_text += "\n" + "-" * 50 + "\n\n"
+            all_cards.write(f"TO: {card['name']} ({card['team']})\n")
+            all_cards.write(f"ACHIEVEMENT: {card['metric']} improved by {card['change']:+.1f}\n\n")
+            all_cards.write(f"{card['message']}\n")
+            all_cards.write("\n" + "-" * 50 + "\n\n")
+        all_cards_text = all_cards.getvalue()
 
         st.download_button(
             label="📥 Export All Valued Cards",
@@ -791,81 +1034,106 @@ def show_trends(colleagues, metrics, targets, combined):
 
 
 # ============== PAGE: STRUGGLING COLLEAGUES ==============
-def show_struggling_colleagues(colleagues, metrics, targets, objectives, combined):
+def build_struggling_prompt(row, colleague_metrics, targets):
+    """Build the struggling-colleague analysis prompt for one row of combined."""
+    # Compact CSV of just the metrics the prompt has targets for - far fewer tokens than to_string()
+    metrics_summary = (colleague_metrics[['Month', 'Quality_Pct', 'FCR_Pct', 'CSAT_Pct', 'NPS', 'AHT_Min',
+                                          'Adherence_Pct', 'Hold_Min', 'Complaint_Rate', 'Critical_Errors']]
+                       .assign(Month=colleague_metrics['Month'].dt.strftime('%Y-%m'))
+                       .round(1)
+                       .to_csv(index=False))
+    # Get targets for this colleague's tenure band
+    colleague_targets = targets.loc[row.Tenure_Band]
+    return get_struggling_analysis_prompt(
+        row._asdict(),
+        metrics_summary,
+        colleague_targets.to_dict(),
+        "Average in tenure band"
+    )
+
+
+def show_struggling_colleagues(colleagues, metrics_by_id, targets, combined):
+    import plotly.graph_objects as go
+
     st.title("⚠️ Colleagues Needing Support")
     st.markdown("---")
 
     # Filter to struggling colleagues (Focus or Below status)
-    struggling = combined[combined['Performance_Status'].isin(['Focus', 'Below'])].sort_values('Performance_Score')
+    struggling = combined[combined['Performance_Status'].isin(SUPPORT_STATUSES)].sort_values('Performance_Score')
 
     st.write(f"**{len(struggling)} colleagues currently need additional support**")
 
-    for _, row in struggling.iterrows():
-        colleague_metrics = metrics[metrics['Colleague_ID'] == row['Colleague_ID']].sort_values('Month')
-        colleague_objectives = objectives[objectives['Colleague_ID'] == row['Colleague_ID']]
-
-        status_color = get_status_color(row['Performance_Status'])
-
-        with st.expander(f"🔴 {row['Name']} - Score: {row['Performance_Score']:.1f}/100 ({row['Performance_Status']})"):
+    # Analyse everyone still missing an analysis in one concurrent batch
+    pending = [row for row in struggling.itertuples(index=False)
+               if not st.session_state.get(f"analysis_{row.Colleague_ID}")]
+    if pending and st.button(f"🤖 Get AI Analysis for All ({len(pending)})", key="ai_all_struggling"):
+        with st.spinner(f"Analysing {len(pending)} colleagues..."):
+            prompts = [
+                build_struggling_prompt(row, metrics_by_id[row.Colleague_ID], targets)
+                for row in pending
+            ]
+            for row, analysis in zip(pending, call_claude_batch(prompts)):
+                st.session_state[f"analysis_{row.Colleague_ID}"] = analysis
+
+    for row in struggling.itertuples(index=False):
+        colleague_metrics = metrics_by_id[row.Colleague_ID]
+
+        with st.expander(f"🔴 {row.Name} - Score: {row.Performance_Score:.1f}/100 ({row.Performance_Status})"):
             col1, col2 = st.columns([1, 2])
 
             with col1:
-                st.write(f"**Team:** {row['Team']}")
-                st.write(f"**Tenure:** {row['Tenure_Band']} ({row['Tenure_Months']}mo)")
-                st.write(f"**Coaching Priority:** {row['Coaching_Priority']}")
+                details = [
+                    f"**Team:** {row.Team}",
+                    f"**Tenure:** {row.Tenure_Band} ({row.Tenure_Months}mo)",
+                    f"**Coaching Priority:** {row.Coaching_Priority}",
+                ]
+
+                risks = decode_risk_flags(row.Risk_Mask)
+                if risks:
+                    details.append("**Risk Flags:**\n" + "\n".join(f"- ⚠️ {risk}" for risk in risks))
 
-                if row['Risk_Flags']:
-                    st.write("**Risk Flags:**")
-                    for risk in row['Risk_Flags']:
-                        st.write(f"- ⚠️ {risk}")
+                st.markdown("\n\n".join(details))
 
             with col2:
-                # Mini trend chart
+                # Mini trend chart - WebGL keeps many open expanders cheap to render
+                trend = downsample_trend(colleague_metrics, 'Month', 'Quality_Pct', TREND_MAX_POINTS)
                 fig = go.Figure()
-                fig.add_trace(go.Scatter(x=colleague_metrics['Month'], y=colleague_metrics['Quality_Pct'],
-                                        mode='lines+markers', name='Quality'))
+                fig.add_trace(go.Scattergl(x=trend['Month'], y=trend['Quality_Pct'],
+                                          mode='lines+markers', name='Quality'))
                 fig.update_layout(height=200, margin=dict(t=20, b=20, l=20, r=20), showlegend=True)
                 st.plotly_chart(fig, use_container_width=True)
 
             # AI Analysis button
-            analysis_key = f"analysis_{row['Colleague_ID']}"
+            analysis_key = f"analysis_{row.Colleague_ID}"
             if analysis_key not in st.session_state:
                 st.session_state[analysis_key] = None
 
-            if st.button(f"Get AI Analysis", key=f"ai_{row['Colleague_ID']}"):
-                with st.spinner("Analyzing..."):
-                    metrics_summary = colleague_metrics.to_string()
-                    # Get targets for this colleague's tenure band
-                    colleague_targets = targets[targets['Tenure_Band'] == row['Tenure_Band']].iloc[0]
-                    prompt = get_struggling_analysis_prompt(
-                        row.to_dict(),
-                        metrics_summary,
-                        colleague_targets.to_dict(),
-                        "Average in tenure band"
-                    )
-                    response = call_claude(prompt)
-                    st.session_state[analysis_key] = response
+            if st.button(f"Get AI Analysis", key=f"ai_{row.Colleague_ID}"):
+                prompt = build_struggling_prompt(row, colleague_metrics, targets)
+                # Render tokens as they arrive, keeping the full text for later reruns
+                st.session_state[analysis_key] = st.write_stream(stream_claude(prompt))
 
-            # Display analysis if available
-            if st.session_state[analysis_key]:
+            # Display previously generated analysis
+            elif st.session_state[analysis_key]:
                 st.markdown(st.session_state[analysis_key])
 
+            if st.session_state[analysis_key]:
                 # Export button
                 export_content = generate_coaching_export(
-                    colleague_name=row['Name'],
-                    team=row['Team'],
-                    tenure=f"{row['Tenure_Band']} ({row['Tenure_Months']} months)",
-                    score=f"{row['Performance_Score']:.1f}",
-                    status=row['Performance_Status'],
+                    colleague_name=row.Name,
+                    team=row.Team,
+                    tenure=f"{row.Tenure_Band} ({row.Tenure_Months} months)",
+                    score=f"{row.Performance_Score:.1f}",
+                    status=row.Performance_Status,
                     coaching_content=st.session_state[analysis_key]
                 )
 
                 st.download_button(
                     label="📥 Export Analysis",
                     data=export_content,
-                    file_name=f"analysis_{row['Name'].replace(' ', '_')}_{pd.Timestamp.now().strftime('%Y%m%d')}.txt",
+                    file_name=f"analysis_{row.Name.replace(' ', '_')}_{pd.Timestamp.now().strftime('%Y%m%d')}.txt",
                     mime="text/plain",
-                    key=f"export_{row['Colleague_ID']}",
+                    key=f"export_{row.Colleague_ID}",
                     help="Download the AI analysis as a text file"
                 )
 
@@ -1040,62 +1308,94 @@ def show_training_hub():
 
 
 # ============== PAGE: AI COACH CHATBOT ==============
-def show_ai_coach(colleagues, metrics, targets, objectives, benchmarks, combined):
-    st.title("🤖 AI Performance Coach")
-    st.markdown("Ask me anything about colleague performance, coaching strategies, or get AI-powered insights.")
-    st.markdown("---")
+@st.cache_data(max_entries=1)
+def get_colleague_first_names(data_version, _colleagues):
+    """
+    Lower-cased first name of each colleague, indexed by Colleague_ID, for spotting mentions in chat.
+    Cached on data version only - the underscore-prefixed frame is not hashed.
+    """
+    return _colleagues['Name'].str.split().str[0].str.lower()
 
-    # Initialize chat history
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
 
-    # Display chat history
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
+# Words that make a question about people or team results, so the all-colleagues table is needed.
+# Matched as whole words (plurals allowed); questions with none of them are general coaching advice.
+TEAM_QUESTION_PATTERN = re.compile(r"\b(?:" + "|".join([
+    'who', 'whose', 'which', 'anyone', 'someone', 'everyone', 'people', 'colleague', 'team', 'staff',
+    'agent', 'advisor', 'starter', 'tenure', 'our', 'we', 'us', 'top', 'best', 'worst', 'highest', 'lowest',
+    'rank', 'compare', 'compared', 'peer', 'average', 'struggling', 'support', 'role model', 'performing', 'performance', 'trend', 'list', 'how many',
+]) + r")s?\b")
 
-    # Chat input
-    if prompt := st.chat_input("Ask about performance, coaching, or get insights..."):
-        # Add user message
-        st.session_state.messages.append({"role": "user", "content": prompt})
-        with st.chat_message("user"):
-            st.markdown(prompt)
 
-        # Generate response
-        with st.chat_message("assistant"):
-            with st.spinner("Analyzing data..."):
-                # Check if a specific colleague is mentioned
-                mentioned_colleagues = []
-                for _, row in colleagues.iterrows():
-                    first_name = row['Name'].split()[0].lower()
-                    full_name = row['Name'].lower()
-                    if first_name in prompt.lower() or full_name in prompt.lower():
-                        mentioned_colleagues.append(row['Colleague_ID'])
+def asks_about_team_data(question, teams):
+    """True when a lower-cased chat question needs the all-colleagues table - people/team words or a team name."""
+    return bool(TEAM_QUESTION_PATTERN.search(question)) or any(team.lower() in question for team in teams)
 
-                # Build comprehensive context
-                context_parts = []
 
-                # Team summary
-                context_parts.append(f"""
-TEAM SUMMARY:
-- Total colleagues: {len(colleagues)}
-- Teams: {', '.join(colleagues['Team'].unique())}
-- Average performance score: {combined['Performance_Score'].mean():.1f}
-- Colleagues needing support: {len(combined[combined['Performance_Status'].isin(['Focus', 'Below'])])}
+@st.cache_data(max_entries=1)
+def get_colleague_summary_csv(data_version, _colleague_summary):
+    """
+    Serialise the all-colleagues summary for the chat context as compact CSV, once per data change.
+    Cached on data version only - the underscore-prefixed frame is not hashed.
+    """
+    return _colleague_summary.to_csv(index=False, float_format='%.1f')
+
+
+@st.cache_data(ttl=3600)
+def build_static_chat_context(data_version, _benchmarks, _targets):
+    """
+    Render the benchmarks, targets and learning library reference data sent with every chat question.
+    They are the same for every question, so they are built once per data version
+    (the hourly expiry also picks up learning library edits).
+    """
+    context = StringIO()
+
+    context.write(f"""REFERENCE DATA (the same for every question - use alongside the data context in the message):
+
+=== INDUSTRY BENCHMARKS (UK Banking) ===
+{_benchmarks.to_csv(index=False)}
+
+=== TENURE BAND TARGETS ===
+{_targets.to_csv(index=False)}
+
 """)
 
-                # If specific colleagues mentioned, include their FULL details
-                if mentioned_colleagues:
-                    context_parts.append("\n=== DETAILED DATA FOR MENTIONED COLLEAGUES ===\n")
-                    for cid in mentioned_colleagues:
-                        colleague_row = colleagues[colleagues['Colleague_ID'] == cid].iloc[0]
-                        colleague_combined = combined[combined['Colleague_ID'] == cid].iloc[0]
-                        colleague_metrics = metrics[metrics['Colleague_ID'] == cid].sort_values('Month')
-                        colleague_objectives = objectives[objectives['Colleague_ID'] == cid]
-                        target_row = targets[targets['Tenure_Band'] == colleague_row['Tenure_Band']].iloc[0]
-
-                        context_parts.append(f"""
---- {colleague_row['Name']} ({cid}) ---
+    # Add learning library
+    learning_library = load_learning_library()
+    context.write("\n=== AVAILABLE LEARNING & SUPPORT COURSES (Workday) ===\n")
+    context.write("These courses are available in our Workday learning system. Recommend specific courses based on colleague needs.\n\n")
+    for course in learning_library.itertuples(index=False):
+        context.write(f"""
+{course.Course_ID}: {course.Course_Name}
+  Category: {course.Category} | Level: {course.Level} | Duration: {course.Duration} | Format: {course.Format}
+  Description: {course.Description}
+  Prerequisites: {course.Prerequisites}
+  Manager must complete: {course.Manager_Pairing if pd.notna(course.Manager_Pairing) and course.Manager_Pairing != 'None' else 'N/A'}
+  Triggers: {course.Triggers}
+  External Resource: {course.External_Resource_Name} - {course.External_Resource_URL}
+
+""")
+
+    return context.getvalue()
+
+
+@st.cache_data(max_entries=64)
+def build_colleague_context(colleague_id, data_version, _colleagues, _combined, _metrics_by_id, _objectives_by_id, _targets):
+    """
+    Render one mentioned colleague's profile, latest metrics, trend and objectives for the chat context.
+    Cached on colleague and data version only - the underscore-prefixed frames are not hashed.
+    """
+    context = StringIO()
+
+    colleague_row = _colleagues.loc[colleague_id]
+    colleague_combined = _combined.loc[colleague_id]
+    colleague_metrics = _metrics_by_id[colleague_id]
+    colleague_objectives = _objectives_by_id[colleague_id]
+    target_row = _targets.loc[colleague_row['Tenure_Band']]
+    # combined holds the team-wide latest month for everyone - a colleague with no row for it has NaT
+    latest_month = _combined['Month'].max()
+
+    context.write(f"""
+--- {colleague_row['Name']} ({colleague_id}) ---
 Profile:
   - Team: {colleague_row['Team']}
   - Tenure: {colleague_row['Tenure_Months']} months ({colleague_row['Tenure_Band']})
@@ -1104,7 +1404,7 @@ Profile:
   - Performance Status: {colleague_combined['Performance_Status']}
   - Coaching Priority: {colleague_combined['Coaching_Priority']}
 
-Latest Month Metrics (December 2024):
+Latest Month Metrics ({latest_month:%B %Y}):
   - Quality Score: {colleague_combined['Quality_Pct']}% (Target: {target_row['Quality_Target']}%)
   - FCR: {colleague_combined['FCR_Pct']}% (Target: {target_row['FCR_Target']}%)
   - CSAT: {colleague_combined['CSAT_Pct']}% (Target: {target_row['CSAT_Target']}%)
@@ -1123,53 +1423,135 @@ Latest Month Metrics (December 2024):
   - Coaching Actions Closed: {colleague_combined['Coaching_Closed']}
 
 3-Month Trend Data:
+
 """)
-                        for _, m in colleague_metrics.iterrows():
-                            month_str = m['Month'].strftime('%Y-%m') if hasattr(m['Month'], 'strftime') else str(m['Month'])[:7]
-                            context_parts.append(f"  {month_str}: Quality={m['Quality_Pct']}%, FCR={m['FCR_Pct']}%, CSAT={m['CSAT_Pct']}%, AHT={m['AHT_Min']}min, NPS={m['NPS']}, Errors={m['Critical_Errors']}")
+    # One CSV block for the whole history instead of formatting each month in Python
+    trend_csv = (colleague_metrics[['Month', 'Quality_Pct', 'FCR_Pct', 'CSAT_Pct', 'AHT_Min', 'NPS', 'Critical_Errors']]
+                 .assign(Month=colleague_metrics['Month'].dt.strftime('%Y-%m'))
+                 .to_csv(index=False))
+    context.write(trend_csv + "\n")
 
-                        context_parts.append("\nYearly Objectives:")
-                        for _, obj in colleague_objectives.iterrows():
-                            context_parts.append(f"  - {obj['Objective_Text']}: {obj['Status']} ({obj['Progress_Pct']}% complete)")
-                        context_parts.append("")
+    context.write("\nYearly Objectives:\n")
+    for obj in colleague_objectives.itertuples(index=False):
+        context.write(f"  - {obj.Objective_Text}: {obj.Status} ({obj.Progress_Pct}% complete)\n")
+    context.write("\n")
+    return context.getvalue()
 
-                # All colleagues summary with key metrics
-                context_parts.append("\n=== ALL COLLEAGUES - KEY METRICS (Latest Month) ===")
-                metrics_cols = ['Name', 'Team', 'Tenure_Band', 'Performance_Score', 'Performance_Status',
-                               'Quality_Pct', 'FCR_Pct', 'CSAT_Pct', 'NPS', 'AHT_Min', 'Critical_Errors', 'Coaching_Priority']
-                context_parts.append(combined[metrics_cols].to_string())
 
-                # Industry benchmarks
-                context_parts.append(f"""
+@st.cache_resource
+def get_chat_answer_cache():
+    """
+    Recent AI Coach answers keyed on the full prompt (question plus data context) and the
+    reference context sent alongside it, shared across sessions.
+    A data change alters the context, so stale answers are never matched.
+    Script threads for different sessions share it - hold get_chat_answer_lock() while using it.
+    """
+    return {}
 
-=== INDUSTRY BENCHMARKS (UK Banking) ===
-{benchmarks.to_string()}
 
-=== TENURE BAND TARGETS ===
-{targets.to_string()}
-""")
+@st.cache_resource
+def get_chat_answer_lock():
+    """Lock guarding the shared chat answer cache against concurrent reads and writes."""
+    return threading.Lock()
+
+
+def add_chat_message(role, content):
+    """Append a chat turn to the history and to the export transcript, which only ever grows."""
+    st.session_state.messages.append({"role": role, "content": content})
+    speaker = "YOU" if role == "user" else "AI COACH"
+    st.session_state.chat_transcript += f"\n{speaker}:\n{content}\n"
+
+
+@st.fragment
+def show_ai_coach_chat(colleagues, metrics_by_id, targets, objectives_by_id, benchmarks, combined, stats):
+    """Chat history, input and export - a fragment, so each message reruns only this block."""
+    # Initialize chat history
+    if "messages" not in st.session_state:
+        st.session_state.messages = []
+        st.session_state.chat_transcript = ""
+
+    # Display chat history - Streamlit clears anything not redrawn, so every turn is emitted each run
+    for message in st.session_state.messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+    # Chat input
+    if prompt := st.chat_input("Ask about performance, coaching, or get insights..."):
+        # Add user message
+        add_chat_message("user", prompt)
+        with st.chat_message("user"):
+            st.markdown(prompt)
+
+        # Generate response
+        with st.chat_message("assistant"):
+            with st.spinner("Analyzing data..."):
+                # The version the frames were loaded from, so cached sections always match them
+                data_version = stats['data_version']
+
+                # Check if a specific colleague is mentioned
+                # A full-name mention always contains the first name, so matching first names is enough
+                prompt_lower = prompt.lower()
+                first_names = get_colleague_first_names(data_version, colleagues)
+                mentioned_colleagues = first_names.index[first_names.map(prompt_lower.__contains__)].tolist()
+
+                # Build comprehensive context
+                context = StringIO()
+
+                # Team summary
+                context.write(f"""
+TEAM SUMMARY:
+- Total colleagues: {len(colleagues)}
+- Teams: {', '.join(colleagues['Team'].unique())}
+- Average performance score: {stats['avg_perf']:.1f}
+- Colleagues needing support: {stats['needing_support']}
 
-                # Add learning library
-                learning_library = load_learning_library()
-                context_parts.append("\n=== AVAILABLE LEARNING & SUPPORT COURSES (Workday) ===")
-                context_parts.append("These courses are available in our Workday learning system. Recommend specific courses based on colleague needs.\n")
-                for _, course in learning_library.iterrows():
-                    context_parts.append(f"""
-{course['Course_ID']}: {course['Course_Name']}
-  Category: {course['Category']} | Level: {course['Level']} | Duration: {course['Duration']} | Format: {course['Format']}
-  Description: {course['Description']}
-  Prerequisites: {course['Prerequisites']}
-  Manager must complete: {course['Manager_Pairing'] if pd.notna(course['Manager_Pairing']) and course['Manager_Pairing'] != 'None' else 'N/A'}
-  Triggers: {course['Triggers']}
-  External Resource: {course['External_Resource_Name']} - {course['External_Resource_URL']}
 """)
 
-                full_context = "\n".join(context_parts)
+                # If specific colleagues mentioned, include their FULL details
+                if mentioned_colleagues:
+                    context.write("\n=== DETAILED DATA FOR MENTIONED COLLEAGUES ===\n\n")
+                    for cid in mentioned_colleagues:
+                        context.write(build_colleague_context(cid, data_version, colleagues, combined, metrics_by_id,
+                                                              objectives_by_id, targets))
+
+                # All colleagues summary with key metrics - skipped for general coaching questions,
+                # where it is most of the prompt but none of the answer
+                if asks_about_team_data(prompt_lower, colleagues['Team'].cat.categories):
+                    metrics_cols = ['Name', 'Team', 'Tenure_Band', 'Performance_Score', 'Performance_Status',
+                                   'Quality_Pct', 'FCR_Pct', 'CSAT_Pct', 'NPS', 'AHT_Min', 'Critical_Errors', 'Coaching_Priority']
+                    context.write("\n=== ALL COLLEAGUES - KEY METRICS (Latest Month) ===\n")
+                    context.write(get_colleague_summary_csv(data_version, combined[metrics_cols]) + "\n")
+
+                full_context = context.getvalue()
                 full_prompt = get_chat_context_prompt(prompt, full_context)
-                response = call_claude(full_prompt)
 
+                # Benchmarks, targets and learning library - prebuilt once per data version and sent
+                # as a cached system block, since they are the same for every question
+                reference_context = build_static_chat_context(data_version, benchmarks, targets)
+
+            # Reuse a recent answer to the same question, otherwise stream tokens as they arrive
+            answers, answers_lock = get_chat_answer_cache(), get_chat_answer_lock()
+            answer_key = (full_prompt, reference_context)
+            now = time.monotonic()
+            with answers_lock:
+                cached = answers.get(answer_key)
+            if cached and now - cached[0] < CHAT_ANSWER_TTL_SECONDS:
+                response = cached[1]
                 st.markdown(response)
-                st.session_state.messages.append({"role": "assistant", "content": response})
+            else:
+                # The lock is not held while streaming, so other sessions are never blocked on the API
+                outcome = {'failed': False}
+                response = st.write_stream(stream_claude(full_prompt, reference_context=reference_context,
+                                                         outcome=outcome))
+                # Never reuse a failed reply - including one that broke off partway through
+                if not outcome['failed']:
+                    with answers_lock:
+                        # Drop expired answers so the store only holds live entries
+                        for key in [k for k, (saved_at, _) in answers.items() if now - saved_at >= CHAT_ANSWER_TTL_SECONDS]:
+                            del answers[key]
+                        answers[answer_key] = (now, response)
+
+            add_chat_message("assistant", response)
 
     # Export chat button
     if st.session_state.messages:
@@ -1186,12 +1568,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}
 
 CONVERSATION
 ------------
-"""
-        for msg in st.session_state.messages:
-            role = "YOU" if msg["role"] == "user" else "AI COACH"
-            chat_export += f"\n{role}:\n{msg['content']}\n"
-
-        chat_export += """
+{st.session_state.chat_transcript}
 ================================================================================
                     Generated by AI Performance Coach
 ================================================================================
@@ -1209,8 +1586,17 @@ CONVERSATION
         with col_clear:
             if st.button("🗑️ Clear Chat"):
                 st.session_state.messages = []
+                st.session_state.chat_transcript = ""
                 st.rerun()
 
+
+def show_ai_coach(colleagues, metrics_by_id, targets, objectives_by_id, benchmarks, combined, stats):
+    st.title("🤖 AI Performance Coach")
+    st.markdown("Ask me anything about colleague performance, coaching strategies, or get AI-powered insights.")
+    st.markdown("---")
+
+    show_ai_coach_chat(colleagues, metrics_by_id, targets, objectives_by_id, benchmarks, combined, stats)
+
     # Example questions
     st.markdown("---")
     st.markdown("**Example questions you can ask:**")
@@ -1234,7 +1620,8 @@ CONVERSATION
 # ============== MAIN APP ==============
 def main():
     # Load data
-    colleagues, metrics, targets, objectives, benchmarks, combined = load_all_data()
+    (colleagues, metrics, targets, objectives, benchmarks, combined,
+     latest_metrics, months, metrics_by_id, objectives_by_id, stats) = load_all_data(get_data_version())
 
     # Sidebar navigation
     st.sidebar.image("https://via.placeholder.com/150x50?text=AI+Coach", width=150)
@@ -1267,26 +1654,25 @@ def main():
     st.sidebar.markdown("---")
     st.sidebar.markdown("### Quick Stats")
     st.sidebar.metric("Total Colleagues", len(colleagues), help="Total number of colleagues in the dashboard")
-    st.sidebar.metric("Avg Performance", f"{combined['Performance_Score'].mean():.1f}", help=METRIC_TOOLTIPS["Performance_Score"])
+    st.sidebar.metric("Avg Performance", f"{stats['avg_perf']:.1f}", help=METRIC_TOOLTIPS["Performance_Score"])
 
-    needing_support = len(combined[combined['Performance_Status'].isin(['Focus', 'Below'])])
-    st.sidebar.metric("Needing Support", needing_support, help="Colleagues in 'Focus' or 'Below' status who need additional coaching and support")
+    st.sidebar.metric("Needing Support", stats['needing_support'], help="Colleagues in 'Focus' or 'Below' status who need additional coaching and support")
 
     # Render selected page
     if selected_page == "Overview Dashboard":
-        show_overview_dashboard(colleagues, metrics, targets, benchmarks, combined)
+        show_overview_dashboard(colleagues, latest_metrics, targets, benchmarks, combined)
     elif selected_page == "Colleague Explorer":
         show_colleague_explorer(colleagues, metrics, combined)
     elif selected_page == "Individual View":
-        show_individual_view(colleagues, metrics, targets, objectives, combined)
+        show_individual_view(colleagues, metrics_by_id, targets, objectives_by_id, combined, stats['data_version'])
     elif selected_page == "Trends & Analytics":
-        show_trends(colleagues, metrics, targets, combined)
+        show_trends(colleagues, metrics, months, targets, combined)
     elif selected_page == "Struggling Colleagues":
-        show_struggling_colleagues(colleagues, metrics, targets, objectives, combined)
+        show_struggling_colleagues(colleagues, metrics_by_id, targets, combined)
     elif selected_page == "Manager Training":
         show_training_hub()
     elif selected_page == "AI Coach":
-        show_ai_coach(colleagues, metrics, targets, objectives, benchmarks, combined)
+        show_ai_coach(colleagues, metrics_by_id, targets, objectives_by_id, benchmarks, combined, stats)
 
 
 if __name__ == "__main__":
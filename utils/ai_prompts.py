@@ -2,6 +2,8 @@
 AI prompt templates for the Claude-powered coaching features.
 """
 
+from io import StringIO
+
 SYSTEM_PROMPT = """You are an expert AI Performance Coach for a UK banking contact centre. Your role is to help managers understand colleague performance, identify areas for improvement, and provide actionable coaching suggestions.
 
 You have access to performance data including:
@@ -37,8 +39,13 @@ Always maintain a professional, supportive tone appropriate for manager-to-colle
 def get_colleague_summary_prompt(colleague_data, metrics_data, targets_data, objectives_data, learning_data=None):
     """Generate prompt for colleague performance summary with learning support."""
 
-    # Helper to determine status vs target
-    def status(actual, target, higher_is_better=True):
+    # Helper to determine status vs target - uses the label precomputed by
+    # calculate_target_statuses when metrics_data is a row of combined
+    def status(metric, target_col, higher_is_better=True):
+        precomputed = metrics_data.get(f'{metric}_Status')
+        if precomputed:
+            return precomputed
+        actual, target = metrics_data[metric], targets_data[target_col]
         if higher_is_better:
             if actual >= target: return "ABOVE TARGET"
             else: return "BELOW TARGET"
@@ -49,21 +56,23 @@ def get_colleague_summary_prompt(colleague_data, metrics_data, targets_data, obj
     # Format learning recommendations if provided
     learning_section = ""
     if learning_data and len(learning_data) > 0:
-        learning_section = "\n\nAVAILABLE SUPPORT & LEARNING (from our Workday system):\n"
+        learning = StringIO()
+        learning.write("\n\nAVAILABLE SUPPORT & LEARNING (from our Workday system):\n")
         for course in learning_data[:10]:  # Limit to 10 courses
             prereqs = course.get('Prerequisites', 'None')
             manager_pair = course.get('Manager_Pairing', 'None')
             external = course.get('External_Resource_Name', '')
             external_url = course.get('External_Resource_URL', '')
 
-            learning_section += f"""
+            learning.write(f"""
 - {course['Course_ID']}: {course['Course_Name']}
   Category: {course['Category']} | Level: {course['Level']} | Duration: {course['Duration']} | Format: {course['Format']}
   Description: {course['Description']}
   Prerequisites: {prereqs}
   Manager action required: {manager_pair if manager_pair != 'None' else 'No manager action required'}
   External resource: {external} ({external_url})
-"""
+""")
+        learning_section = learning.getvalue()
 
     return f"""Based on the following colleague data, provide a concise performance summary with strengths, areas for improvement, coaching recommendations, AND a tailored support plan with specific learning recommendations.
 
@@ -77,16 +86,16 @@ IMPORTANT: This colleague's targets are adjusted for their tenure band. Only fla
 PERFORMANCE vs TENURE-ADJUSTED TARGETS:
 | Metric | Actual | Target | Status |
 |--------|--------|--------|--------|
-| Quality Score | {metrics_data['Quality_Pct']}% | {targets_data['Quality_Target']}% | {status(metrics_data['Quality_Pct'], targets_data['Quality_Target'])} |
-| FCR | {metrics_data['FCR_Pct']}% | {targets_data['FCR_Target']}% | {status(metrics_data['FCR_Pct'], targets_data['FCR_Target'])} |
-| CSAT | {metrics_data['CSAT_Pct']}% | {targets_data['CSAT_Target']}% | {status(metrics_data['CSAT_Pct'], targets_data['CSAT_Target'])} |
-| NPS | {metrics_data['NPS']} | {targets_data['NPS_Target']} | {status(metrics_data['NPS'], targets_data['NPS_Target'])} |
-| AHT | {metrics_data['AHT_Min']} min | {targets_data['AHT_Target']} min | {status(metrics_data['AHT_Min'], targets_data['AHT_Target'], False)} |
-| Adherence | {metrics_data['Adherence_Pct']}% | {targets_data['Adherence_Target']}% | {status(metrics_data['Adherence_Pct'], targets_data['Adherence_Target'])} |
-| Hold Time | {metrics_data['Hold_Min']} min | {targets_data['Hold_Target']} min | {status(metrics_data['Hold_Min'], targets_data['Hold_Target'], False)} |
-| ACW | {metrics_data['ACW_Min']} min | {targets_data['ACW_Target']} min | {status(metrics_data['ACW_Min'], targets_data['ACW_Target'], False)} |
-| Critical Errors | {metrics_data['Critical_Errors']} | 0 | {"ABOVE TARGET" if metrics_data['Critical_Errors'] == 0 else "BELOW TARGET"} |
-| Complaint Rate | {metrics_data['Complaint_Rate']} | {targets_data['Complaint_Rate_Target']} | {status(metrics_data['Complaint_Rate'], targets_data['Complaint_Rate_Target'], False)} |
+| Quality Score | {metrics_data['Quality_Pct']}% | {targets_data['Quality_Target']}% | {status('Quality_Pct', 'Quality_Target')} |
+| FCR | {metrics_data['FCR_Pct']}% | {targets_data['FCR_Target']}% | {status('FCR_Pct', 'FCR_Target')} |
+| CSAT | {metrics_data['CSAT_Pct']}% | {targets_data['CSAT_Target']}% | {status('CSAT_Pct', 'CSAT_Target')} |
+| NPS | {metrics_data['NPS']} | {targets_data['NPS_Target']} | {status('NPS', 'NPS_Target')} |
+| AHT | {metrics_data['AHT_Min']} min | {targets_data['AHT_Target']} min | {status('AHT_Min', 'AHT_Target', False)} |
+| Adherence | {metrics_data['Adherence_Pct']}% | {targets_data['Adherence_Target']}% | {status('Adherence_Pct', 'Adherence_Target')} |
+| Hold Time | {metrics_data['Hold_Min']} min | {targets_data['Hold_Target']} min | {status('Hold_Min', 'Hold_Target', False)} |
+| ACW | {metrics_data['ACW_Min']} min | {targets_data['ACW_Target']} min | {status('ACW_Min', 'ACW_Target', False)} |
+| Critical Errors | {metrics_data['Critical_Errors']} | 0 | {metrics_data.get('Critical_Errors_Status') or ("ABOVE TARGET" if metrics_data['Critical_Errors'] == 0 else "BELOW TARGET")} |
+| Complaint Rate | {metrics_data['Complaint_Rate']} | {targets_data['Complaint_Rate_Target']} | {status('Complaint_Rate', 'Complaint_Rate_Target', False)} |
 
 OBJECTIVES STATUS:
 {objectives_data}
@@ -9,6 +9,9 @@ def calculate_metric_score(actual, target, higher_is_better=True):
     """
     Calculate a component score with realistic distribution.
 
+    Accepts scalars or array-likes (e.g. DataFrame columns); arrays are
+    scored element-wise and a scalar input returns a float.
+
     Scoring logic (designed for bell curve):
     - 10%+ above target: 95-100 (Role Model territory)
     - At target to 10% above: 80-94 (Strong territory)
@@ -16,31 +19,41 @@ def calculate_metric_score(actual, target, higher_is_better=True):
     - 10-20% below target: 50-64 (Focus territory)
     - More than 20% below: 0-49 (Below territory)
     """
-    if higher_is_better:
-        if target == 0:
-            return 0
-        ratio = actual / target
-    else:
-        # For metrics where lower is better (AHT, Hold, ACW)
-        if actual == 0:
-            return 100
-        ratio = target / actual
-
-    if ratio >= 1.10:
-        # 10%+ above target: 95-100
-        return min(100, 95 + (ratio - 1.10) * 50)
-    elif ratio >= 1.0:
-        # At target to 10% above: 80-94
-        return 80 + (ratio - 1.0) * 140
-    elif ratio >= 0.90:
-        # Within 10% of target: 65-79
-        return 65 + (ratio - 0.90) * 140
-    elif ratio >= 0.80:
-        # 10-20% below: 50-64
-        return 50 + (ratio - 0.80) * 140
-    else:
-        # More than 20% below: 0-49
-        return max(0, ratio * 62.5)
+    actual = np.asarray(actual, dtype=float)
+    target = np.asarray(target, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if higher_is_better:
+            # A zero target scores 0
+            ratio = np.where(target == 0, 0.0, actual / target)
+        else:
+            # For metrics where lower is better (AHT, Hold, ACW) - zero actual scores 100
+            ratio = np.where(actual == 0, np.inf, target / actual)
+
+    score = np.select(
+        [ratio >= 1.10, ratio >= 1.0, ratio >= 0.90, ratio >= 0.80],
+        [
+            np.minimum(100, 95 + (ratio - 1.10) * 50),  # 10%+ above target: 95-100
+            80 + (ratio - 1.0) * 140,                   # At target to 10% above: 80-94
+            65 + (ratio - 0.90) * 140,                  # Within 10% of target: 65-79
+            50 + (ratio - 0.80) * 140,                  # 10-20% below: 50-64
+        ],
+        default=np.maximum(0, ratio * 62.5)             # More than 20% below: 0-49
+    )
+
+    return score if score.ndim else float(score)
+
+
+# (metric column, target column, higher is better, weight) for the overall score;
+# compliance (critical errors) carries the remaining 10%
+SCORE_COMPONENTS = [
+    ('Quality_Pct', 'Quality_Target', True, 0.25),
+    ('FCR_Pct', 'FCR_Target', True, 0.20),
+    ('CSAT_Pct', 'CSAT_Target', True, 0.20),
+    ('AHT_Min', 'AHT_Target', False, 0.15),
+    ('Adherence_Pct', 'Adherence_Target', True, 0.10),
+]
+COMPLIANCE_WEIGHT = 0.10
 
 
 def calculate_performance_score(row, targets_row):
@@ -48,6 +61,8 @@ def calculate_performance_score(row, targets_row):
     Calculate overall performance score (0-100) based on weighted metrics.
 
     Uses realistic scoring where missing targets results in meaningful penalties.
+    Works on a single row or on a whole DataFrame holding both the metric and
+    target columns, in which case a Series of scores is returned.
 
     Weights:
     - Quality: 25%
@@ -57,43 +72,40 @@ def calculate_performance_score(row, targets_row):
     - Adherence: 10%
     - Compliance (Critical Errors): 10%
     """
-    scores = []
-    weights = []
+    overall_score = sum(
+        calculate_metric_score(row[metric], targets_row[target], higher_is_better) * weight
+        for metric, target, higher_is_better, weight in SCORE_COMPONENTS
+    )
 
-    # Quality score (25%)
-    quality_score = calculate_metric_score(row['Quality_Pct'], targets_row['Quality_Target'], True)
-    scores.append(quality_score)
-    weights.append(0.25)
+    # Compliance score - 0 errors = 100, each error reduces by 40
+    compliance_score = np.maximum(0, 100 - (row['Critical_Errors'] * 40))
+    overall_score = overall_score + compliance_score * COMPLIANCE_WEIGHT
 
-    # FCR score (20%)
-    fcr_score = calculate_metric_score(row['FCR_Pct'], targets_row['FCR_Target'], True)
-    scores.append(fcr_score)
-    weights.append(0.20)
+    return np.round(overall_score, 1)
 
-    # CSAT score (20%)
-    csat_score = calculate_metric_score(row['CSAT_Pct'], targets_row['CSAT_Target'], True)
-    scores.append(csat_score)
-    weights.append(0.20)
 
-    # AHT score (15%) - lower is better
-    aht_score = calculate_metric_score(row['AHT_Min'], targets_row['AHT_Target'], False)
-    scores.append(aht_score)
-    weights.append(0.15)
-
-    # Adherence score (10%)
-    adherence_score = calculate_metric_score(row['Adherence_Pct'], targets_row['Adherence_Target'], True)
-    scores.append(adherence_score)
-    weights.append(0.10)
+def calculate_performance_scores(df, targets_df=None):
+    """
+    Vectorised calculate_performance_score for a whole DataFrame of metrics.
 
-    # Compliance score (10%) - 0 errors = 100, each error reduces by 40
-    compliance_score = max(0, 100 - (row['Critical_Errors'] * 40))
-    scores.append(compliance_score)
-    weights.append(0.10)
+    Targets are looked up by Tenure_Band from targets_df; if it is omitted the
+    target columns are read from df itself (e.g. an already-merged frame).
+    All component scores are stacked into one array and weighted with a
+    single dot product. Returns a Series aligned to df's index.
+    """
+    if targets_df is None:
+        targets = df
+    else:
+        targets = targets_df.set_index('Tenure_Band').reindex(np.asarray(df['Tenure_Band'], dtype=object))
 
-    # Calculate weighted average
-    overall_score = sum(s * w for s, w in zip(scores, weights))
+    components = np.column_stack(
+        [calculate_metric_score(df[metric], targets[target], higher_is_better)
+         for metric, target, higher_is_better, _ in SCORE_COMPONENTS]
+        + [np.maximum(0, 100 - df['Critical_Errors'].to_numpy(dtype=float) * 40)]
+    )
+    weights = np.array([weight for *_, weight in SCORE_COMPONENTS] + [COMPLIANCE_WEIGHT])
 
-    return round(overall_score, 1)
+    return pd.Series(np.round(components @ weights, 1), index=df.index, name='Performance_Score')
 
 
 def get_performance_status(score):
@@ -118,16 +130,53 @@ def get_performance_status(score):
         return "Below"
 
 
+def get_performance_statuses(scores):
+    """Vectorised get_performance_status for a Series of scores."""
+    return pd.cut(
+        scores,
+        bins=[-np.inf, 50, 65, 80, 90, np.inf],
+        labels=["Below", "Focus", "On Track", "Strong", "Role Model"],
+        right=False
+    )
+
+
+STATUS_COLORS = {
+    "Role Model": "#10B981",  # Green
+    "Strong": "#3B82F6",       # Blue
+    "On Track": "#6366F1",     # Indigo
+    "Focus": "#F59E0B",        # Amber
+    "Below": "#EF4444"         # Red
+}
+DEFAULT_STATUS_COLOR = "#6B7280"
+
+
 def get_status_color(status):
     """Get color for performance status."""
-    colors = {
-        "Role Model": "#10B981",  # Green
-        "Strong": "#3B82F6",       # Blue
-        "On Track": "#6366F1",     # Indigo
-        "Focus": "#F59E0B",        # Amber
-        "Below": "#EF4444"         # Red
-    }
-    return colors.get(status, "#6B7280")
+    return STATUS_COLORS.get(status, DEFAULT_STATUS_COLOR)
+
+
+def get_status_colors(statuses):
+    """
+    Vectorised get_status_color for a Series of statuses.
+    On a categorical Series each category is looked up once, not each row.
+    """
+    return statuses.map(STATUS_COLORS).astype(object).fillna(DEFAULT_STATUS_COLOR)
+
+
+def calculate_performance_columns(df, targets_df=None):
+    """
+    Score, status and status colour for every row in one pipeline - the
+    vectorised calculate_performance_score -> get_performance_status ->
+    get_status_color chain. targets_df is as for calculate_performance_scores.
+    Returns a DataFrame with Performance_Score, Performance_Status and Status_Color.
+    """
+    scores = calculate_performance_scores(df, targets_df)
+    statuses = get_performance_statuses(scores)
+    return pd.DataFrame({
+        'Performance_Score': scores,
+        'Performance_Status': statuses,
+        'Status_Color': get_status_colors(statuses),
+    }, index=df.index)
 
 
 def calculate_trend(metrics_df, metric_column):
@@ -138,13 +187,16 @@ def calculate_trend(metrics_df, metric_column):
     if len(metrics_df) < 2:
         return "Stable"
 
-    sorted_df = metrics_df.sort_values('Month')
-    values = sorted_df[metric_column].values
+    # Per-colleague frames arrive already in month order - only sort if they don't
+    if not metrics_df['Month'].is_monotonic_increasing:
+        metrics_df = metrics_df.sort_values('Month')
+    values = metrics_df[metric_column].to_numpy(dtype=float)
 
-    # Calculate trend using linear regression slope
-    if len(values) >= 2:
-        x = np.arange(len(values))
-        slope = np.polyfit(x, values, 1)[0]
+    # Calculate trend using the closed-form least-squares slope over x = 0..n-1
+    n = values.size
+    if n >= 2:
+        x_centred = np.arange(n) - (n - 1) / 2
+        slope = (x_centred * values).sum() / (n * (n * n - 1) / 12)
 
         # Determine trend based on slope magnitude
         threshold = 0.02 * np.mean(values)  # 2% of mean as threshold
@@ -157,6 +209,59 @@ def calculate_trend(metrics_df, metric_column):
     return "Stable"
 
 
+def lttb_indices(x, y, n_out):
+    """
+    Pick the positions of n_out points that best preserve the shape of a line
+    using Largest-Triangle-Three-Buckets downsampling.
+    The first and last points are always kept; returns all positions if the
+    series already has n_out points or fewer.
+    """
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('int64')
+    x = x.astype(float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    indices = np.empty(n_out, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    selected = 0
+
+    for i in range(n_out - 2):
+        # Current bucket, and the next bucket whose average anchors the triangle
+        start = 1 + (i * (n - 2)) // (n_out - 2)
+        end = 1 + ((i + 1) * (n - 2)) // (n_out - 2)
+        next_end = 1 + ((i + 2) * (n - 2)) // (n_out - 2) if i < n_out - 3 else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        areas = np.abs((x[selected] - avg_x) * (y[start:end] - y[selected])
+                       - (x[selected] - x[start:end]) * (avg_y - y[selected]))
+        selected = start + int(np.argmax(areas))
+        indices[i + 1] = selected
+
+    return indices
+
+
+def downsample_trend(df, x_column, y_column, max_points=500, group_column=None):
+    """
+    Reduce a trend DataFrame to at most max_points rows per line with LTTB,
+    so chart rendering cost stays bounded as history grows.
+    Rows are kept as-is (not interpolated); small series are returned unchanged.
+    """
+    if group_column is None:
+        if len(df) <= max_points:
+            return df
+        return df.iloc[lttb_indices(df[x_column], df[y_column], max_points)]
+
+    keep = [group.index[lttb_indices(group[x_column], group[y_column], max_points)]
+            for _, group in df.groupby(group_column, sort=False, observed=True)]
+    return df.loc[np.concatenate(keep)] if keep else df
+
+
 def get_trend_icon(trend):
     """Get icon for trend direction."""
     icons = {
@@ -201,23 +306,26 @@ def get_rag_color(rag):
     return colors.get(rag, "#6B7280")
 
 
+# (priority name, metric column, target column, higher is better) considered for coaching
+PRIORITY_METRICS = [
+    ("Quality", 'Quality_Pct', 'Quality_Target', True),
+    ("FCR", 'FCR_Pct', 'FCR_Target', True),
+    ("CSAT", 'CSAT_Pct', 'CSAT_Target', True),
+    ("AHT", 'AHT_Min', 'AHT_Target', False),
+    ("Adherence", 'Adherence_Pct', 'Adherence_Target', True),
+]
+
+
 def identify_coaching_priority(row, targets_row):
     """
     Identify the top priority metric for coaching.
     Returns the metric with the largest gap to target.
     """
-    metrics = {
-        "Quality": (row['Quality_Pct'], targets_row['Quality_Target'], True),
-        "FCR": (row['FCR_Pct'], targets_row['FCR_Target'], True),
-        "CSAT": (row['CSAT_Pct'], targets_row['CSAT_Target'], True),
-        "AHT": (row['AHT_Min'], targets_row['AHT_Target'], False),
-        "Adherence": (row['Adherence_Pct'], targets_row['Adherence_Target'], True),
-    }
-
     max_gap = 0
     priority = None
 
-    for metric, (actual, target, higher_better) in metrics.items():
+    for metric, actual_col, target_col, higher_better in PRIORITY_METRICS:
+        actual, target = row[actual_col], targets_row[target_col]
         if higher_better:
             gap = (target - actual) / target if target > 0 else 0
         else:
@@ -230,6 +338,28 @@ def identify_coaching_priority(row, targets_row):
     return priority if priority else "Maintain Performance"
 
 
+def identify_coaching_priorities(df):
+    """
+    Vectorised identify_coaching_priority for a DataFrame holding both the
+    metric and target columns.
+    """
+    names = np.array([name for name, *_ in PRIORITY_METRICS] + ["Maintain Performance"], dtype=object)
+
+    gaps = []
+    for _, actual_col, target_col, higher_better in PRIORITY_METRICS:
+        actual = df[actual_col].to_numpy(dtype=float)
+        target = df[target_col].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gap = (target - actual) / target if higher_better else (actual - target) / target
+        gaps.append(np.where(target > 0, gap, 0))
+
+    # Rows x metrics; shortfalls only, so a colleague meeting every target has a max gap of 0
+    gaps = np.clip(np.nan_to_num(np.stack(gaps, axis=1), nan=0.0), 0, None)
+    priority = np.where(gaps.max(axis=1) > 0, np.argmax(gaps, axis=1), len(names) - 1)
+
+    return pd.Series(names[priority], index=df.index)
+
+
 def calculate_risk_flag(row):
     """
     Determine if colleague has a risk flag.
@@ -253,28 +383,129 @@ def calculate_risk_flag(row):
     return risks if risks else None
 
 
+# Risk flags in display order; flag i is bit i of a risk mask
+RISK_FLAGS = ["Compliance Risk", "Quality Risk", "CX Risk", "Complaint Risk"]
+
+# Decoded flags for every possible mask, so decoding is a tuple lookup
+RISK_FLAG_LISTS = tuple(
+    tuple(flag for bit, flag in enumerate(RISK_FLAGS) if mask >> bit & 1)
+    for mask in range(1 << len(RISK_FLAGS))
+)
+
+
+def calculate_risk_masks(df):
+    """
+    Vectorised calculate_risk_flag for a DataFrame of metrics, packed as an
+    int8 bitmask per row (0 where no risks apply). Decode with decode_risk_flags.
+    """
+    conditions = [
+        df['Critical_Errors'] > 0,
+        df['Quality_Pct'] < 75,
+        df['CSAT_Pct'] < 75,
+        df['Complaint_Rate'] > 7,
+    ]
+
+    mask = np.zeros(len(df), dtype=np.int8)
+    for bit, condition in enumerate(conditions):
+        mask |= condition.to_numpy(dtype=np.int8) << bit
+    return pd.Series(mask, index=df.index, name='Risk_Mask')
+
+
+def decode_risk_flags(mask):
+    """Get a new risk flag list for a risk mask, or None if it has no risks."""
+    return list(RISK_FLAG_LISTS[mask]) or None
+
+
+def calculate_risk_flags(df):
+    """
+    Vectorised calculate_risk_flag for a DataFrame of metrics.
+    Returns a Series of risk lists (None where no risks apply).
+    """
+    return calculate_risk_masks(df).map(decode_risk_flags).astype(object)
+
+
+# (metric column, target column, higher is better) for the support-plan status table
+TARGET_COMPARISONS = [
+    ('Quality_Pct', 'Quality_Target', True),
+    ('FCR_Pct', 'FCR_Target', True),
+    ('CSAT_Pct', 'CSAT_Target', True),
+    ('NPS', 'NPS_Target', True),
+    ('AHT_Min', 'AHT_Target', False),
+    ('Adherence_Pct', 'Adherence_Target', True),
+    ('Hold_Min', 'Hold_Target', False),
+    ('ACW_Min', 'ACW_Target', False),
+    ('Complaint_Rate', 'Complaint_Rate_Target', False),
+]
+
+
+def calculate_target_statuses(df):
+    """
+    Label each metric "ABOVE TARGET" or "BELOW TARGET" for every row of a DataFrame
+    holding both metric and target columns. Critical errors are judged against zero.
+    Returns a DataFrame with one <metric>_Status column per metric.
+    """
+    statuses = {}
+    for metric, target, higher_is_better in TARGET_COMPARISONS:
+        met = df[metric] >= df[target] if higher_is_better else df[metric] <= df[target]
+        statuses[f'{metric}_Status'] = np.where(met, "ABOVE TARGET", "BELOW TARGET")
+    statuses['Critical_Errors_Status'] = np.where(df['Critical_Errors'] == 0, "ABOVE TARGET", "BELOW TARGET")
+
+    return pd.DataFrame(statuses, index=df.index)
+
+
+QUARTILE_LABELS = ["Q1 (Top 25%)", "Q2", "Q3", "Q4 (Bottom 25%)"]
+
+
+def quartile_labels(percentiles):
+    """Map percentiles (share of peers scoring lower, 0-100) to quartile labels."""
+    percentiles = np.asarray(percentiles)
+    return np.select(
+        [percentiles >= 75, percentiles >= 50, percentiles >= 25],
+        QUARTILE_LABELS[:3],
+        default=QUARTILE_LABELS[3]
+    )
+
+
 def calculate_peer_quartile(colleague_metrics, all_metrics_same_band):
     """
     Calculate which quartile the colleague falls into within their tenure band.
     Returns: Q1 (Top 25%), Q2, Q3, or Q4 (Bottom 25%)
+    Unscored (NaN) peers are left out of the ranking; an unscored colleague is Q4.
     """
-    if len(all_metrics_same_band) < 4:
+    # Use overall performance score for ranking
+    scores = all_metrics_same_band['Performance_Score'].to_numpy(dtype=float)
+    scores = np.sort(scores[~np.isnan(scores)])
+    if len(scores) < 4:
         return "N/A"
 
-    # Use overall performance score for ranking
-    scores = all_metrics_same_band['Performance_Score'].values
     colleague_score = colleague_metrics['Performance_Score']
+    if pd.isna(colleague_score):
+        return QUARTILE_LABELS[3]
 
-    percentile = (scores < colleague_score).sum() / len(scores) * 100
+    percentile = np.searchsorted(scores, colleague_score, side='left') / len(scores) * 100
 
-    if percentile >= 75:
-        return "Q1 (Top 25%)"
-    elif percentile >= 50:
-        return "Q2"
-    elif percentile >= 25:
-        return "Q3"
-    else:
-        return "Q4 (Bottom 25%)"
+    return str(quartile_labels(percentile))
+
+
+def assign_quartiles(scores):
+    """
+    Batched calculate_peer_quartile - the quartile of every score within the
+    group it belongs to, from one sort and one searchsorted.
+    Returns an array of labels aligned to scores ("N/A" for fewer than 4 valid
+    scores). NaN scores are not ranked and are labelled Q4, as in the scalar version.
+
+    >>> list(assign_quartiles([90, 80, float('nan'), 70, 60]))
+    ['Q1 (Top 25%)', 'Q2', 'Q4 (Bottom 25%)', 'Q3', 'Q4 (Bottom 25%)']
+    """
+    scores = np.asarray(scores, dtype=float)
+    valid = ~np.isnan(scores)
+    if valid.sum() < 4:
+        return np.full(len(scores), "N/A", dtype=object)
+
+    labels = np.full(len(scores), QUARTILE_LABELS[3], dtype=object)
+    ranks = np.searchsorted(np.sort(scores[valid]), scores[valid], side='left')
+    labels[valid] = quartile_labels(ranks / valid.sum() * 100)
+    return labels
 
 
 def calculate_goal_summary(objectives_df):
@@ -282,15 +513,14 @@ def calculate_goal_summary(objectives_df):
     Calculate summary of goal attainment.
     Returns dict with counts by status.
     """
-    if len(objectives_df) == 0:
-        return {"total": 0, "achieved": 0, "on_track": 0, "at_risk": 0, "behind": 0}
+    counts = objectives_df['Status'].value_counts()
 
     summary = {
         "total": len(objectives_df),
-        "achieved": len(objectives_df[objectives_df['Status'] == 'Achieved']),
-        "on_track": len(objectives_df[objectives_df['Status'] == 'On Track']),
-        "at_risk": len(objectives_df[objectives_df['Status'] == 'At Risk']),
-        "behind": len(objectives_df[objectives_df['Status'] == 'Behind'])
+        "achieved": int(counts.get('Achieved', 0)),
+        "on_track": int(counts.get('On Track', 0)),
+        "at_risk": int(counts.get('At Risk', 0)),
+        "behind": int(counts.get('Behind', 0))
     }
 
     return summary
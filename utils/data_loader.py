@@ -3,50 +3,157 @@ Data loading utilities for the AI Performance Coach application.
 """
 import pandas as pd
 import os
+import shutil
+import hashlib
+from functools import lru_cache, wraps
 from pathlib import Path
 
+from utils.calculations import calculate_performance_columns, assign_quartiles
+
 # Get the base directory
 BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / "data"
+CACHE_DIR = BASE_DIR / ".cache"
+
+# Bump when the shape or derivation of cached frames changes
+CACHE_FORMAT_VERSION = 12
+
+# Parse CSVs with the multithreaded Arrow reader rather than pandas' Python-level parser
+CSV_ENGINE = "pyarrow"
+
+# Source files whose modification times key the on-disk cache
+SOURCE_FILES = [
+    DATA_DIR / "colleagues.csv",
+    DATA_DIR / "monthly_metrics.csv",
+    DATA_DIR / "targets.csv",
+    DATA_DIR / "objectives.csv",
+    DATA_DIR / "industry_benchmarks.csv",
+]
+
+
+# Low-cardinality text columns, held as categoricals so filters and groupbys
+# compare integer codes on any supported pandas version (other text columns keep
+# pandas' default string dtype - object on pandas 2, Arrow-backed on pandas 3)
+CATEGORY_COLUMNS = {
+    "colleagues.csv": {'Team': 'category', 'Tenure_Band': 'category'},
+    "objectives.csv": {'Objective_Type': 'category', 'Category': 'category', 'Status': 'category'},
+}
+
+
+def source_mtimes(filename):
+    """Modification times of a source CSV and its Parquet copy (0 when there is no copy)."""
+    csv_path = DATA_DIR / filename
+    parquet_path = csv_path.with_suffix('.parquet')
+    parquet_mtime = parquet_path.stat().st_mtime_ns if parquet_path.exists() else 0
+    return csv_path.stat().st_mtime_ns, parquet_mtime
 
 
+def read_source(filename, **csv_options):
+    """
+    Read a source file, preferring its typed Parquet copy (written by
+    convert_sources_to_parquet) unless the CSV has been edited since.
+    csv_options only apply when falling back to the CSV.
+    """
+    csv_mtime, parquet_mtime = source_mtimes(filename)
+    if parquet_mtime >= csv_mtime:
+        # Memory-map the file so Arrow decodes straight from the page cache rather than a read buffer
+        return pd.read_parquet((DATA_DIR / filename).with_suffix('.parquet'), engine='pyarrow', memory_map=True)
+    return pd.read_csv(DATA_DIR / filename, engine=CSV_ENGINE, **csv_options)
+
+
+def cached_source(filename):
+    """
+    Memoise a loader on its source files' modification times, so each file is
+    parsed once per process and re-read only after it is edited.
+    Callers receive a copy, so mutating the result never touches the cache;
+    read-only callers can use the loader's .memoised() to skip the copy.
+    """
+    def decorator(loader):
+        @lru_cache(maxsize=1)
+        def load(mtimes):
+            return loader()
+
+        @wraps(loader)
+        def wrapper():
+            return load(source_mtimes(filename)).copy()
+
+        def memoised():
+            """The shared cached frame - callers must filter or copy it, never mutate it."""
+            return load(source_mtimes(filename))
+
+        wrapper.memoised = memoised
+        wrapper.cache_clear = load.cache_clear
+        wrapper.source_filename = filename
+        return wrapper
+
+    return decorator
+
+
+@cached_source("colleagues.csv")
 def load_colleagues():
     """Load colleague dimension data."""
-    return pd.read_csv(DATA_DIR / "colleagues.csv")
+    # Keep Start_Date as text - the Arrow reader would otherwise infer dates
+    df = read_source("colleagues.csv", dtype={'Start_Date': str})
+    return df.astype(CATEGORY_COLUMNS["colleagues.csv"])
 
 
+@cached_source("monthly_metrics.csv")
 def load_monthly_metrics():
     """Load monthly performance metrics."""
-    df = pd.read_csv(DATA_DIR / "monthly_metrics.csv")
+    df = read_source("monthly_metrics.csv")
+    # A no-op for the Parquet copy, which already stores Month as a datetime
     df['Month'] = pd.to_datetime(df['Month'])
     return df
 
 
+@cached_source("targets.csv")
 def load_targets():
     """Load tenure-based targets."""
-    return pd.read_csv(DATA_DIR / "targets.csv")
+    return read_source("targets.csv")
 
 
+@cached_source("objectives.csv")
 def load_objectives():
     """Load colleague objectives."""
-    df = pd.read_csv(DATA_DIR / "objectives.csv")
+    df = read_source("objectives.csv", dtype={'Target_Date': str})
     df['Target_Date'] = pd.to_datetime(df['Target_Date'])
-    return df
+    return df.astype(CATEGORY_COLUMNS["objectives.csv"])
 
 
+@cached_source("industry_benchmarks.csv")
 def load_industry_benchmarks():
     """Load industry benchmark data."""
-    return pd.read_csv(DATA_DIR / "industry_benchmarks.csv")
+    return read_source("industry_benchmarks.csv")
 
 
+@cached_source("learning_library.csv")
 def load_learning_library():
     """Load learning library with courses and support resources."""
-    return pd.read_csv(DATA_DIR / "learning_library.csv")
+    return read_source("learning_library.csv")
 
 
+@cached_source("external_resources.csv")
 def load_external_resources():
     """Load external support resources."""
-    return pd.read_csv(DATA_DIR / "external_resources.csv")
+    return read_source("external_resources.csv")
+
+
+SOURCE_LOADERS = [
+    load_colleagues, load_monthly_metrics, load_targets, load_objectives,
+    load_industry_benchmarks, load_learning_library, load_external_resources,
+]
+
+
+def convert_sources_to_parquet():
+    """
+    Write a typed Parquet copy next to each source CSV (dates already parsed),
+    which the loaders then read instead of re-parsing the CSV.
+    Re-run after editing a CSV; until then the edited CSV is used.
+    """
+    for loader in SOURCE_LOADERS:
+        path = (DATA_DIR / loader.source_filename).with_suffix('.parquet')
+        loader().to_parquet(path, engine='pyarrow', index=False)
+        print(f"Wrote {path.relative_to(BASE_DIR)}")
 
 
 def get_recommended_learning(metrics_data, targets_data, tenure_band):
@@ -133,13 +240,28 @@ def get_colleague_objectives(colleague_id):
     return objectives[objectives['Colleague_ID'] == colleague_id]
 
 
-def get_team_metrics(team_name, month=None):
-    """Get metrics for a specific team, optionally filtered by month."""
+@lru_cache(maxsize=1)
+def _metrics_with_dims(colleague_mtimes, metric_mtimes):
+    """
+    Monthly metrics with each colleague's Team and Tenure_Band joined on.
+    The join is done once per version of the source files.
+    """
     colleagues = load_colleagues()
-    metrics = load_monthly_metrics()
+    # Already categoricals (CATEGORY_COLUMNS), so filtering on them compares category codes
+    dims = colleagues.set_index('Colleague_ID')[['Team', 'Tenure_Band']]
+    return load_monthly_metrics().join(dims, on='Colleague_ID')
+
 
-    team_colleagues = colleagues[colleagues['Team'] == team_name]['Colleague_ID'].tolist()
-    team_metrics = metrics[metrics['Colleague_ID'].isin(team_colleagues)]
+def _memoised_metrics_with_dims():
+    """The shared pre-joined frame - callers must filter or copy it, never mutate it."""
+    return _metrics_with_dims(source_mtimes("colleagues.csv"), source_mtimes("monthly_metrics.csv"))
+
+
+def get_team_metrics(team_name, month=None):
+    """Get metrics for a specific team, optionally filtered by month."""
+    # Boolean indexing already returns a new frame, so the memoised one is filtered directly
+    metrics = _memoised_metrics_with_dims()
+    team_metrics = metrics[metrics['Team'] == team_name]
 
     if month:
         team_metrics = team_metrics[team_metrics['Month'] == month]
@@ -149,11 +271,8 @@ def get_team_metrics(team_name, month=None):
 
 def get_tenure_band_metrics(tenure_band, month=None):
     """Get metrics for a specific tenure band, optionally filtered by month."""
-    colleagues = load_colleagues()
-    metrics = load_monthly_metrics()
-
-    band_colleagues = colleagues[colleagues['Tenure_Band'] == tenure_band]['Colleague_ID'].tolist()
-    band_metrics = metrics[metrics['Colleague_ID'].isin(band_colleagues)]
+    metrics = _memoised_metrics_with_dims()
+    band_metrics = metrics[metrics['Tenure_Band'] == tenure_band]
 
     if month:
         band_metrics = band_metrics[band_metrics['Month'] == month]
@@ -163,23 +282,87 @@ def get_tenure_band_metrics(tenure_band, month=None):
 
 def get_latest_month():
     """Get the latest month in the data."""
-    metrics = load_monthly_metrics()
-    return metrics['Month'].max()
+    # Only reads one column, so the memoised frame is used without copying it
+    return load_monthly_metrics.memoised()['Month'].max()
 
 
-def get_all_data():
-    """Load all data and merge for comprehensive view."""
+@lru_cache(maxsize=1)
+def _all_data(source_versions):
     colleagues = load_colleagues()
     metrics = load_monthly_metrics()
     targets = load_targets()
 
     # Get latest metrics for each colleague
-    latest_metrics = metrics.sort_values('Month', ascending=False).groupby('Colleague_ID').first().reset_index()
+    # Picked with one groupby-reduce rather than a full sort by month
+    latest_idx = metrics.groupby('Colleague_ID', sort=False)['Month'].idxmax()
+    latest_metrics = metrics.loc[latest_idx].set_index('Colleague_ID')
+
+    # Join latest metrics, then tenure-band targets, on unique keyed indexes
+    combined = colleagues.set_index('Colleague_ID').join(latest_metrics, how='left')
+    combined = combined.join(targets.set_index('Tenure_Band'), on='Tenure_Band')
+
+    # Score every colleague once here, so callers read columns instead of rescoring rows
+    combined = combined.join(calculate_performance_columns(combined))
+    combined['Peer_Quartile'] = combined.groupby('Tenure_Band', observed=True)['Performance_Score'].transform(
+        assign_quartiles
+    )
 
-    # Merge colleague info with latest metrics
-    combined = pd.merge(colleagues, latest_metrics, on='Colleague_ID', how='left')
+    return combined.reset_index()
 
-    # Merge with targets based on tenure band
-    combined = pd.merge(combined, targets, on='Tenure_Band', how='left')
 
-    return combined
+def get_all_data():
+    """
+    Load all data and merge for comprehensive view, with each colleague's latest
+    Performance_Score, Performance_Status, Status_Color and Peer_Quartile (within
+    their tenure band). Built once per version of the source files.
+    """
+    source_versions = tuple(source_mtimes(name) for name in ("colleagues.csv", "monthly_metrics.csv", "targets.csv"))
+    return _all_data(source_versions).copy()
+
+
+def get_data_version():
+    """Get a hash of the source file modification times, used to key cached data."""
+    digest = hashlib.md5(f"format:{CACHE_FORMAT_VERSION}".encode())
+    for path in SOURCE_FILES:
+        digest.update(f"{path.name}:{path.stat().st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def read_cached_frames(version, names):
+    """
+    Read previously cached DataFrames for a data version from Parquet.
+    Returns a dict of name -> DataFrame, or None if any frame is missing.
+    """
+    version_dir = CACHE_DIR / version
+    paths = {name: version_dir / f"{name}.parquet" for name in names}
+    if not all(path.exists() for path in paths.values()):
+        return None
+
+    try:
+        return {name: pd.read_parquet(path) for name, path in paths.items()}
+    except Exception:
+        # A partial or corrupt cache is treated as a miss
+        return None
+
+
+def write_cached_frames(version, frames):
+    """
+    Persist DataFrames for a data version to Parquet, replacing older versions.
+    Caching is best-effort - failures (e.g. a read-only filesystem) are ignored.
+    """
+    try:
+        if CACHE_DIR.exists():
+            for stale_dir in CACHE_DIR.iterdir():
+                if stale_dir.name != version:
+                    shutil.rmtree(stale_dir, ignore_errors=True)
+
+        version_dir = CACHE_DIR / version
+        version_dir.mkdir(parents=True, exist_ok=True)
+        for name, df in frames.items():
+            df.to_parquet(version_dir / f"{name}.parquet", compression='zstd')
+    except Exception:
+        pass
+
+
+if __name__ == "__main__":
+    convert_sources_to_parquet()